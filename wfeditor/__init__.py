@@ -0,0 +1,51 @@
+"""Headless watch face library behind the IDW20 editor: model, rendering, packaging and validation.
+
+Importing the package does not import tkinter or PIL; each name below loads its
+submodule on first use.
+"""
+__version__ = "0.10.0"
+
+# public name -> submodule that defines it
+_EXPORTS = {
+    "WatchFaceModel": "model",
+    "load_face": "model",
+    "AssetManager": "assets",
+    "AssetIndex": "assets",
+    "AssetWatcher": "assets",
+    "DiskAssetCache": "assets",
+    "DeviceProfile": "profiles",
+    "IDW20_PROFILE": "profiles",
+    "DEVICE_PROFILES": "profiles",
+    "get_device_profile": "profiles",
+    "load_device_profiles": "profiles",
+    "Renderer": "render",
+    "MultiProfileRenderer": "render",
+    "QUALITY_DRAFT": "render",
+    "QUALITY_FINAL": "render",
+    "PreviewExporter": "preview",
+    "Packager": "package",
+    "validate_iwf_data": "validation",
+    "validate_font_data": "validation",
+    "FootprintAnalyzer": "footprint",
+    "trim_face_assets": "trim",
+    "reconcile_font_data": "fonts",
+    "run_golden_corpus": "golden",
+    "diff_faces": "facediff",
+    "lint_face": "lint",
+    "migrate_corpus": "migrate",
+    "RenderService": "server",
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
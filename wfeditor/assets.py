@@ -0,0 +1,569 @@
+"""Asset lookup, caching and change watching"""
+import os, json, hashlib, threading
+
+from .startup import Image
+
+class AssetIndex:
+    """Case-insensitive index of the workspace, built from one os.scandir walk.
+
+    Answers every asset lookup from memory; it rescans only when invalidated, when the
+    root changes or when one of the scanned folders' mtime moved.
+    """
+
+    MAX_DEPTH = 3  # root/widgets/<type>/<font>/ is the deepest layout we read
+    SKIP_DIRS = {"__pycache__", "golden"}
+
+    def __init__(self, root=None):
+        self.root = root  # None follows the current working directory
+        self.files = {}   # lower relpath -> [relpath, ...]
+        self.dirs = {}    # lower relpath -> [relpath, ...]
+        self.ambiguous = {}  # lower relpath -> case variants found on disk
+        self.generation = 0  # bumped on every scan
+        self._dir_mtimes = {}
+        self._scanned_root = None
+        self._stale = True
+        self._reported = set()
+
+    def root_path(self):
+        return os.path.abspath(self.root or os.getcwd())
+
+    def scan(self):
+        root = self.root_path()
+        files, dirs, mtimes = {}, {}, {}
+        stack = [("", 0)]
+        while stack:
+            rel, depth = stack.pop()
+            full = os.path.join(root, rel) if rel else root
+            try:
+                mtimes[full] = os.stat(full).st_mtime_ns
+                with os.scandir(full) as entries:
+                    for entry in entries:
+                        child = f"{rel}/{entry.name}" if rel else entry.name
+                        if entry.is_dir():
+                            if entry.name.startswith(".") or entry.name in self.SKIP_DIRS:
+                                continue
+                            dirs.setdefault(child.lower(), []).append(child)
+                            if depth < self.MAX_DEPTH:
+                                stack.append((child, depth + 1))
+                        else:
+                            files.setdefault(child.lower(), []).append(child)
+            except OSError:
+                continue
+        ambiguous = {k: sorted(v) for table in (files, dirs) for k, v in table.items() if len(v) > 1}
+        # Swap in whole tables so readers on other threads never see a half-built index
+        self.files, self.dirs, self.ambiguous = files, dirs, ambiguous
+        self._dir_mtimes = mtimes
+        self._scanned_root = root
+        self._stale = False
+        self.generation += 1
+
+    def invalidate(self):
+        self._stale = True
+
+    def refresh_if_stale(self):
+        """Rescan if a scanned folder changed; one stat per folder, no listing"""
+        if not self._stale and self._scanned_root == self.root_path():
+            for path, mtime in list(self._dir_mtimes.items()):
+                try:
+                    if os.stat(path).st_mtime_ns != mtime:
+                        break
+                except OSError:
+                    break
+            else:
+                return
+        self.scan()
+
+    def _ensure(self):
+        if self._stale or self._scanned_root != self.root_path():
+            self.scan()
+
+    def _lookup(self, table, rel):
+        self._ensure()  # may swap in new tables, so look them up by name afterwards
+        norm = os.path.normpath(rel).replace(os.sep, "/")
+        matches = getattr(self, table).get(norm.lower())
+        if not matches:
+            return None
+        match = matches[0]
+        if len(matches) > 1:
+            match = norm if norm in matches else sorted(matches)[0]
+            if norm.lower() not in self._reported:
+                self._reported.add(norm.lower())
+                print(f"Ambiguous asset name {rel}: {', '.join(sorted(matches))} (using {match})")
+        return os.path.join(self._scanned_root, match)
+
+    def _beyond_index(self, rel):
+        return os.path.normpath(rel).count(os.sep) > self.MAX_DEPTH or rel.startswith("..")
+
+    def _inside(self, path):
+        # Absolute paths under the root are looked up like relative ones
+        if os.path.isabs(path):
+            rel = os.path.relpath(path, self.root_path())
+            return None if rel.startswith("..") else rel
+        return path
+
+    def resolve_file(self, name_or_path):
+        """Absolute path of an asset file, or None.
+
+        A miss falls back to the bare file name in the workspace root, as top-level
+        bkground and hand names always have; glyphs use resolve_in instead.
+        """
+        rel = self._inside(name_or_path)
+        if rel is None:
+            if os.path.isfile(name_or_path):
+                return name_or_path
+            # Try just the basename in the workspace root
+            return self._lookup("files", os.path.basename(name_or_path))
+        name_or_path = rel
+        path = self._lookup("files", name_or_path)
+        if path is None and self._beyond_index(name_or_path):
+            full = os.path.join(self.root_path(), name_or_path)
+            path = full if os.path.isfile(full) else None
+        if path is None:
+            path = self._lookup("files", os.path.basename(name_or_path))
+        return path
+
+    def resolve_in(self, folder, name):
+        """Absolute path of a file directly inside folder, or None; no fallback to the workspace root"""
+        path = os.path.join(folder, name)
+        rel = self._inside(path)
+        if rel is None:
+            return path if os.path.isfile(path) else None
+        found = self._lookup("files", rel)
+        if found is None and self._beyond_index(rel):
+            full = os.path.join(self.root_path(), rel)
+            found = full if os.path.isfile(full) else None
+        return found
+
+    def resolve_dir(self, rel):
+        """Absolute path of a folder, or None"""
+        inside = self._inside(rel)
+        if inside is None:
+            return rel if os.path.isdir(rel) else None
+        rel = inside
+        path = self._lookup("dirs", rel)
+        if path is None and self._beyond_index(rel):
+            full = os.path.join(self.root_path(), rel)
+            path = full if os.path.isdir(full) else None
+        return path
+
+    def relpath(self, path):
+        """Workspace-relative archive style name ("/" separators) of an absolute path"""
+        return os.path.relpath(path, self.root_path()).replace(os.sep, "/")
+
+def default_cache_dir():
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "wf_editor_idw20", "assets")
+
+class DiskAssetCache:
+    """Decoded RGBA buffers on disk, keyed by source path, mtime and size, so restarts skip PNG decoding"""
+
+    MAGIC = b"WFRG"
+    HEADER = 16  # magic, width, height (uint32 LE), reserved
+    CLEANUP_EVERY = 64  # stores between size checks
+
+    def __init__(self, cache_dir=None, max_bytes=256 * 1024 * 1024, use_mmap=True):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.use_mmap = use_mmap
+        self._stores = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _entry(self, path, st):
+        key = f"{os.path.abspath(path)}\0{st.st_mtime_ns}\0{st.st_size}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".rgba")
+
+    def load(self, path, st):
+        """Cached image for this exact file version, or None"""
+        entry = self._entry(path, st)
+        try:
+            with open(entry, "rb") as f:
+                header = f.read(self.HEADER)
+                if len(header) != self.HEADER or header[:4] != self.MAGIC:
+                    return None
+                w = int.from_bytes(header[4:8], "little")
+                h = int.from_bytes(header[8:12], "little")
+                if self.use_mmap:
+                    import mmap
+                    data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))[self.HEADER:]
+                else:
+                    data = f.read()
+            if len(data) != w * h * 4:
+                return None
+            os.utime(entry)  # least recently used entries are evicted first
+        except (OSError, ValueError):
+            return None
+        # Shares the mapped buffer; PIL copies it before any in-place change
+        return Image.frombuffer("RGBA", (w, h), data, "raw", "RGBA", 0, 1)
+
+    def store(self, path, st, img):
+        entry = self._entry(path, st)
+        tmp = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+        header = self.MAGIC + img.width.to_bytes(4, "little") + img.height.to_bytes(4, "little") + bytes(4)
+        try:
+            with open(tmp, "wb") as f:
+                f.write(header)
+                f.write(img.tobytes())
+            os.replace(tmp, entry)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self._stores += 1
+        if self._stores % self.CLEANUP_EVERY == 0:
+            self.cleanup()
+
+    def cleanup(self):
+        """Evict least recently used entries until the cache is under 80% of max_bytes; returns bytes freed"""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for e in it:
+                    if e.is_file() and e.name.endswith(".rgba"):
+                        st = e.stat()
+                        entries.append((st.st_mtime, st.st_size, e.path))
+        except OSError:
+            return 0
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return 0
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= self.max_bytes * 0.8:
+                break
+            try:
+                os.remove(path)
+                freed += size
+            except OSError:
+                pass  # still mapped by someone (Windows); try again next time
+        return freed
+
+    def clear(self):
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".rgba"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+def pixel_digest(img):
+    """Content hash of a decoded image; equal digests mean pixel-identical images"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{img.mode}{img.size}".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+def premultiplied_pair(img):
+    """(color with opaque alpha as "RGBa", alpha mask) of a straight-alpha RGBA image.
+
+    canvas.paste(color, pos, mask) on an "RGBa" (premultiplied) canvas computes
+    src * a + dst * (1 - a) for every channel, which is exactly premultiplied "over",
+    in one C call with no crop/composite/paste round trip.
+    """
+    mask = img.getchannel("A")
+    color = img.copy()
+    color.putalpha(255)
+    # With alpha at 255 this is lossless; stored as RGBa so paste() never converts per call
+    return color.convert("RGBa"), mask
+
+def pivot_safe_box(alpha_box, size, pivot):
+    """Crop box for a hand: its alpha bounding box, but on each axis the edge farther from
+    the (integer) pivot is kept. Renderer._paste_centered pads the image to max(p, size - p)
+    around the pivot before rotating, so that padded canvas, and the frame, stay identical."""
+    x0, y0, x1, y1 = alpha_box
+    (px, py), (w, h) = pivot, size
+    if px >= w - px:
+        x0 = 0
+    else:
+        x1 = w
+    if py >= h - py:
+        y0 = 0
+    else:
+        y1 = h
+    return x0, y0, x1, y1
+
+class AssetManager:
+    def __init__(self, root=None, disk_cache=None, max_bytes=None):
+        self.index = AssetIndex(root)
+        self.disk_cache = disk_cache  # optional DiskAssetCache shared across sessions
+        self.max_bytes = max_bytes  # decoded bytes kept before the oldest images are dropped; None keeps all
+        self.decoded_bytes = 0
+        self.images = {}  # name -> PIL Image
+        self.fonts = {}   # name -> font data
+        self.paths = {}   # name -> resolved absolute path of the cached image
+        self.trimmed = {} # name -> (image cropped to alpha bbox or None, (offset x, y), original size)
+        self.hands = {}   # name -> {pivot: load_hand entry}
+        self.digests = {} # name -> pixel_digest of the cached image
+        self.generation = 0  # bumped whenever cached assets are invalidated
+        self._shared = {}  # pixel digest -> the one decoded image (and trimmed entry) for that content
+        self._shared_trimmed = {}
+        self.premultiplied = {}  # name -> load_premultiplied entry
+        self._shared_premultiplied = {}
+        self._lock = threading.Lock()
+
+    def load_image(self, name_or_path):
+        img = self.images.get(name_or_path)
+        if img is not None:
+            return img
+        # Absolute path, workspace-relative path or bare basename, case-insensitively
+        path = self.index.resolve_file(name_or_path)
+        if path is None:
+            raise FileNotFoundError(f"Asset not found: {name_or_path}")
+        img = None
+        if self.disk_cache is not None:
+            st = os.stat(path)
+            img = self.disk_cache.load(path, st)
+        if img is None:
+            img = Image.open(path).convert("RGBA")
+            if self.disk_cache is not None:
+                self.disk_cache.store(path, st, img)
+        digest = pixel_digest(img)
+        with self._lock:
+            # Pixel-identical assets (the same digits under several font names) share one copy
+            if digest in self._shared:
+                img = self._shared[digest]
+            else:
+                self._shared[digest] = img
+                self.decoded_bytes += img.size[0] * img.size[1] * 4
+            self.images[name_or_path] = img
+            self.paths[name_or_path] = os.path.abspath(path)
+            self.digests[name_or_path] = digest
+            if self.max_bytes is not None and self.decoded_bytes > self.max_bytes:
+                # Oldest first, never the image just loaded; evicted assets reload on demand
+                self._drop([key for key in self.images if key != name_or_path],
+                           until=lambda: self.decoded_bytes <= self.max_bytes)
+        return img
+
+    def _drop(self, keys, until=None):
+        # Caller holds self._lock
+        dropped = 0
+        for key in keys:
+            if until is not None and until():
+                break
+            self.images.pop(key, None)
+            self.paths.pop(key, None)
+            self.trimmed.pop(key, None)
+            self.hands.pop(key, None)
+            self.premultiplied.pop(key, None)
+            digest = self.digests.pop(key, None)
+            dropped += 1
+            if digest is not None and digest not in self.digests.values():
+                img = self._shared.pop(digest, None)
+                if img is not None:
+                    self.decoded_bytes -= img.size[0] * img.size[1] * 4
+                self._shared_trimmed.pop(digest, None)
+                self._shared_premultiplied.pop(digest, None)
+        return dropped
+
+    def get(self, key):
+        return self.images.get(key)
+
+    def load_trimmed(self, name_or_path):
+        """Image cropped to its alpha bounding box, so compositing skips empty margins"""
+        entry = self.trimmed.get(name_or_path)
+        if entry is None:
+            img = self.load_image(name_or_path)
+            digest = self.digests[name_or_path]
+            entry = self._shared_trimmed.get(digest)
+            if entry is None:
+                box = img.getchannel("A").getbbox()
+                if box is None:
+                    entry = (None, (0, 0), img.size)  # fully transparent
+                elif box == (0, 0) + img.size:
+                    entry = (img, (0, 0), img.size)
+                else:
+                    entry = (img.crop(box), box[:2], img.size)
+                self._shared_trimmed[digest] = entry
+            self.trimmed[name_or_path] = entry
+        return entry
+
+    def load_hand(self, name_or_path, pivot):
+        """load_trimmed entry for a hand rotated about pivot, cropped with pivot_safe_box"""
+        entries = self.hands.setdefault(name_or_path, {})
+        entry = entries.get(pivot)
+        if entry is None:
+            img = self.load_image(name_or_path)
+            box = img.getchannel("A").getbbox()
+            if box is None:
+                entry = (None, (0, 0), img.size)  # fully transparent
+            else:
+                box = pivot_safe_box(box, img.size, pivot)
+                entry = (img if box == (0, 0) + img.size else img.crop(box), box[:2], img.size)
+            entries[pivot] = entry
+        return entry
+
+    def load_premultiplied(self, name_or_path):
+        """load_trimmed entry with the image as a premultiplied_pair, for RGBa canvases"""
+        entry = self.premultiplied.get(name_or_path)
+        if entry is None:
+            img, offset, size = self.load_trimmed(name_or_path)
+            digest = self.digests[name_or_path]
+            entry = self._shared_premultiplied.get(digest)
+            if entry is None:
+                entry = (premultiplied_pair(img) if img is not None else None, offset, size)
+                self._shared_premultiplied[digest] = entry
+            self.premultiplied[name_or_path] = entry
+        return entry
+
+    def invalidate(self, paths):
+        """Drop cached images loaded from any of paths (files or folders); returns how many"""
+        self.index.invalidate()
+        root = self.index.root_path()
+        targets = [os.path.join(root, p) for p in paths]
+        with self._lock:
+            stale = [key for key, path in self.paths.items()
+                     if any(path == t or path.startswith(t + os.sep) for t in targets)]
+            if self._drop(stale):
+                self.generation += 1
+        return len(stale)
+    
+    def load_font_json(self, path):
+        if not os.path.isabs(path):
+            path = os.path.join(os.getcwd(), path)
+        if not os.path.exists(path):
+            base = os.path.basename(path)
+            if os.path.exists(base):
+                path = base
+            else:
+                raise FileNotFoundError(f"Font JSON not found: {path}")
+        with open(path, "r", encoding="utf-8") as f:
+            font_data = json.load(f)
+        
+        # Handle both array and dictionary formats
+        if isinstance(font_data, list):
+            # Convert array format to dictionary
+            converted_data = {}
+            for item in font_data:
+                if isinstance(item, dict) and "name" in item:
+                    converted_data[item["name"]] = item
+            font_data = converted_data
+        elif isinstance(font_data, dict) and "item" in font_data and isinstance(font_data["item"], list):
+            # Handle the case where fonts are in an "item" array
+            converted_data = {}
+            for item in font_data["item"]:
+                if isinstance(item, dict) and "name" in item:
+                    converted_data[item["name"]] = item
+            font_data = converted_data
+        
+        self.fonts[path] = font_data
+        return font_data
+
+# watch/time image key -> prefix of its center/anchor keys
+HAND_KEYS = {"hour": "hour", "minute": "min", "second": "sec"}
+
+# Special glyph file names -> character they draw
+GLYPH_SPECIAL_CHARS = {
+    "colon": ":",
+    "slash": "/",
+    "degree": "o",
+    "percent": "%",
+    "C": "C",
+    "F": "F",
+    "AM": "AM",
+    "PM": "PM",
+    "period": ".",
+    "A": "A",
+    "P": "P",
+    "M": "M",
+    "dash": "-"
+}
+
+def glyph_folder_candidates(widget_type, font_name):
+    """Folders searched for a widget's glyph PNGs, in priority order"""
+    # 1. widgets/[widget_type]/[font_name]/ (new structure)
+    # 2. widgets/[widget_type]/ (old structure)
+    # 3. fonts/[font_name]/ (C++ app structure for compatibility)
+    return [
+        os.path.join("widgets", widget_type, font_name),
+        os.path.join("widgets", widget_type),
+        os.path.join("fonts", font_name),
+        font_name  # Just the font name itself
+    ]
+
+def find_glyph_folder(widget_type, font_name, index=None):
+    """First existing glyph folder; resolved through an AssetIndex when one is given"""
+    for path in glyph_folder_candidates(widget_type, font_name):
+        if index is not None:
+            found = index.resolve_dir(path)
+            if found:
+                return found
+        elif os.path.exists(path):
+            return path
+    return None
+
+def referenced_asset_paths(model):
+    """Every file or folder the face reads assets from, including glyph folders that may appear later"""
+    paths = set()
+    d = model.data
+    if d.get("bkground"):
+        paths.add(d["bkground"])
+    for it in d.get("item", []):
+        if it.get("widget") == "watch" and it.get("type") == "time":
+            for key in ("hour", "minute", "second"):
+                if it.get(key):
+                    paths.add(it[key])
+        elif it.get("widget") == "custom" and it.get("type"):
+            paths.update(glyph_folder_candidates(it.get("type"), it.get("font", "")))
+    return paths
+
+class AssetWatcher:
+    """Polls every referenced asset path in a background thread and collects changed paths"""
+
+    def __init__(self, model, interval=1.0):
+        self.model = model
+        self.interval = interval
+        self._snapshot = {}
+        self._changed = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._snapshot = self._scan()
+        self._thread = threading.Thread(target=self._run, name="AssetWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def drain(self):
+        """Return and clear the paths that changed since the last call"""
+        with self._lock:
+            changed, self._changed = self._changed, set()
+        return changed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                snapshot = self._scan()
+            except RuntimeError:
+                continue  # model mutated while we were reading it; retry next tick
+            changed = {p for p in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(p) != self._snapshot.get(p)}
+            self._snapshot = snapshot
+            if changed:
+                with self._lock:
+                    self._changed |= changed
+
+    def _scan(self):
+        # path -> (mtime_ns, size) for files; glyph folders contribute one entry per PNG
+        # Keys stay relative to the asset root, which is what AssetManager.invalidate expects
+        snapshot = {}
+        root = self.model.assets.index.root_path()
+        for path in list(referenced_asset_paths(self.model)):
+            full = os.path.join(root, path)
+            try:
+                if os.path.isdir(full):
+                    snapshot[path] = "dir"
+                    with os.scandir(full) as entries:
+                        for entry in entries:
+                            if entry.is_file() and entry.name.lower().endswith(".png"):
+                                st = entry.stat()
+                                snapshot[os.path.join(path, entry.name)] = (st.st_mtime_ns, st.st_size)
+                else:
+                    st = os.stat(full)
+                    snapshot[path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                pass  # missing for now; shows up as a change once it exists
+        return snapshot
@@ -0,0 +1,278 @@
+"""Headless commands: python -m wfeditor <command> ..."""
+import os, time
+
+from .quantize import DITHER_MODES
+
+def _golden(args):
+    from .golden import run_golden_corpus
+    start = time.perf_counter()
+    results = run_golden_corpus(args.corpus, args.tolerance, args.max_pixels, args.update, args.jobs,
+                                args.check_trim)
+    failed = [r for r in results if r["status"] in ("FAIL", "ERROR")]
+    for r in results:
+        if r["status"] != "ok" or args.verbose:
+            detail = r.get("error") or f'{r["changed"]} px changed, max diff {r["max_diff"]}'
+            print(f'{r["status"]:7} {os.path.basename(r["face"])} {r["case"]}: {detail}')
+    faces = len({r["face"] for r in results})
+    print(f"{len(results)} cases in {faces} faces, {len(failed)} failed ({time.perf_counter() - start:.2f}s)")
+    return 1 if failed else 0
+
+def _trim(args):
+    from .model import WatchFaceModel
+    from .trim import trim_face_assets, format_trim_report
+    os.chdir(args.face)
+    model = WatchFaceModel()
+    model.load_json("iwf.json")
+    report = trim_face_assets(model, apply=args.apply)
+    if args.apply:
+        model.save_json("iwf.json")
+    print(format_trim_report(report))
+    return 0
+
+def _fonts(args):
+    from .model import WatchFaceModel
+    from .fonts import reconcile_font_data, format_font_report
+    os.chdir(args.face)
+    model = WatchFaceModel()
+    if os.path.exists("iwf.json"):
+        model.load_json("iwf.json")
+    if os.path.exists("font.json"):
+        model.load_font_json("font.json")
+    report = reconcile_font_data(model, jobs=args.jobs, update_bpp=args.update_bpp)
+    if args.apply:
+        model.save_font_json("font.json")
+    print(format_font_report(report))
+    return 0
+
+def _dedup(args):
+    from .model import WatchFaceModel
+    from .package import Packager, format_sharing_report
+    os.chdir(args.face)
+    model = WatchFaceModel()
+    model.load_json("iwf.json")
+    print(format_sharing_report(Packager(model).sharing_report()))
+    return 0
+
+def _package(args):
+    from .model import WatchFaceModel
+    from .package import Packager
+    from .footprint import format_bytes
+    out_path = os.path.abspath(args.out)
+    os.chdir(args.face)
+    model = WatchFaceModel()
+    model.load_json("iwf.json")
+    if os.path.exists("font.json"):
+        model.load_font_json("font.json")
+    start = time.perf_counter()
+    report = Packager(model).build(out_path, dedup=args.dedup)
+    for name, size in report["entries"]:
+        print(f"  {format_bytes(size):>10}  {name}")
+    peak = format_bytes(report["peak_rss"]) if report["peak_rss"] else "n/a"
+    print(f'{len(report["entries"])} entries, {format_bytes(report["total"])} written to {out_path} '
+          f'in {time.perf_counter() - start:.2f}s, peak RSS {peak}')
+    return 0
+
+def _compression(args):
+    from .model import WatchFaceModel
+    from .compression import benchmark_codecs, format_benchmark_report, apply_recommendation, compress_face
+    os.chdir(args.face)
+    model = WatchFaceModel()
+    model.load_json("iwf.json")
+    if os.path.exists("font.json"):
+        model.load_font_json("font.json")
+    start = time.perf_counter()
+    report = benchmark_codecs(model, jobs=args.jobs, budget_ms=args.budget_ms)
+    print(format_benchmark_report(report))
+    if args.apply:
+        from .footprint import format_bytes
+        codec = apply_recommendation(model, report)
+        model.save_json("iwf.json")
+        packed = compress_face(model, jobs=args.jobs)
+        print(f'iwf.json "compress" set to {codec}: {format_bytes(packed["raw"])} of assets '
+              f'-> {format_bytes(packed["size"])}')
+    print(f"({time.perf_counter() - start:.2f}s)")
+    return 0
+
+def _quantize(args):
+    import datetime
+    from .model import WatchFaceModel
+    from .render import Renderer
+    from .quantize import quantization_error
+    out_path = args.out and os.path.abspath(args.out)
+    os.chdir(args.face)
+    model = WatchFaceModel()
+    model.load_json("iwf.json")
+    if os.path.exists("font.json"):
+        model.load_font_json("font.json")
+    if args.bpp:
+        for font in model.font_data.get("item", []):
+            font["bpp"] = args.bpp
+            model.changed(font)
+    renderer = Renderer(model)
+    when = datetime.time(10, 8, 36)
+    original = renderer.render(when)
+    renderer.quantize_glyphs = args.dither
+    start = time.perf_counter()
+    quantized = renderer.render(when)
+    print(f"quantized glyph sets in {time.perf_counter() - start:.2f}s, "
+          f"mean error {quantization_error(original, quantized):.2f} per channel")
+    if out_path:
+        quantized.save(out_path)
+        print(f"wrote {out_path}")
+    return 0
+
+def _composite_bench(args):
+    from .model import WatchFaceModel
+    from .render import benchmark_compositing
+    os.chdir(args.face)
+    model = WatchFaceModel()
+    model.load_json("iwf.json")
+    if os.path.exists("font.json"):
+        model.load_font_json("font.json")
+    r = benchmark_compositing(model, args.frames)
+    print(f'straight alpha:  {r["straight"]:.2f} ms/frame')
+    print(f'premultiplied:   {r["premultiplied"]:.2f} ms/frame ({r["straight"] / r["premultiplied"]:.2f}x)')
+    print(f'max pixel difference {r["max_diff"]} over {r["frames"]} frames')
+    return 0
+
+def _diff(args):
+    from .facediff import diff_faces, format_face_diff, save_diff_images
+    start = time.perf_counter()
+    report = diff_faces(args.old, args.new, tolerance=args.tolerance)
+    print(format_face_diff(report))
+    if args.out:
+        for path in save_diff_images(report, args.out):
+            print(f"wrote {path}")
+    print(f"compared in {time.perf_counter() - start:.2f}s")
+    changed = any(report[k][kind] for k in ("items", "fonts", "assets") for kind in ("added", "removed", "changed"))
+    return 1 if changed or report["fields"] or any(f["changed"] for f in report["frames"]) else 0
+
+def _lint(args):
+    from .model import WatchFaceModel
+    from .lint import lint_face, format_lint_report, ERROR
+    os.chdir(args.face)
+    model = WatchFaceModel()
+    model.load_json("iwf.json")
+    if os.path.exists("font.json"):
+        model.load_font_json("font.json")
+    start = time.perf_counter()
+    problems = lint_face(model, jobs=args.jobs)
+    print(format_lint_report(problems))
+    print(f"checked in {(time.perf_counter() - start) * 1000.0:.1f} ms")
+    return 1 if any(p[0] == ERROR for p in problems) else 0
+
+def _migrate(args):
+    from .migrate import migrate_corpus, format_migration_report
+    start = time.perf_counter()
+    plans = migrate_corpus(args.faces, apply=args.apply, keep_legacy=args.keep_legacy, jobs=args.jobs)
+    print(format_migration_report(plans))
+    print(f"{time.perf_counter() - start:.2f}s")
+    return 1 if any("error" in p for p in plans) else 0
+
+def _serve(args):
+    from .server import serve
+    serve(args.faces, args.host, args.port, args.workers, args.cache_size)
+    return 0
+
+def add_profiles_option(parser):
+    parser.add_argument("--profiles", default=None, metavar="JSON",
+                        help='sibling device profiles: a JSON list of {"deviceId", "canvas", "preview", ...}')
+
+def load_profiles_option(args):
+    if args.profiles:
+        from .profiles import load_device_profiles
+        load_device_profiles(args.profiles)
+
+def add_commands(sub):
+    """Register every headless command on an argparse subparsers object"""
+    golden = sub.add_parser("golden", help="render a corpus of faces and compare against golden PNGs")
+    golden.add_argument("corpus", help="folder containing one sub-folder per face")
+    golden.add_argument("--tolerance", type=int, default=0, help="per-channel difference ignored per pixel")
+    golden.add_argument("--max-pixels", type=int, default=0, help="changed pixels allowed per case")
+    golden.add_argument("--update", action="store_true", help="rewrite the golden PNGs")
+    golden.add_argument("--jobs", type=int, default=None, help="worker processes")
+    golden.add_argument("--check-trim", action="store_true",
+                        help="also require renders from untrimmed hand PNGs to match exactly")
+    golden.add_argument("-v", "--verbose", action="store_true", help="also list passing cases")
+    golden.set_defaults(run=_golden)
+
+    trim = sub.add_parser("trim", help="crop hand/glyph PNGs of a face to their alpha bounding box")
+    trim.add_argument("face", help="face folder containing iwf.json")
+    trim.add_argument("--apply", action="store_true", help="rewrite hand PNGs and their centers in iwf.json")
+    trim.set_defaults(run=_trim)
+
+    fonts = sub.add_parser("fonts", help="generate or reconcile font.json from widgets/ and fonts/")
+    fonts.add_argument("face", help="face folder")
+    fonts.add_argument("--apply", action="store_true", help="write the reconciled font.json")
+    fonts.add_argument("--update-bpp", action="store_true", help="overwrite existing bpp with the inferred one")
+    fonts.add_argument("--jobs", type=int, default=None, help="scanner threads")
+    fonts.set_defaults(run=_fonts)
+
+    dedup = sub.add_parser("dedup", help="report pixel-identical glyphs shared across fonts")
+    dedup.add_argument("face", help="face folder containing iwf.json")
+    dedup.set_defaults(run=_dedup)
+
+    pkg = sub.add_parser("package", help="build a face package")
+    pkg.add_argument("face", help="face folder containing iwf.json")
+    pkg.add_argument("out", help="package file to write (.iwf or .zip)")
+    pkg.add_argument("--dedup", action="store_true",
+                     help="store pixel-identical glyphs once, listed in dedup.json (not read by the watch)")
+    pkg.set_defaults(run=_package)
+
+    bench = sub.add_parser("compression", help="benchmark compression codecs over a face's assets")
+    bench.add_argument("face", help="face folder containing iwf.json")
+    bench.add_argument("--jobs", type=int, default=None, help="worker threads")
+    bench.add_argument("--budget-ms", type=float, default=20.0, help="estimated device decode time allowed per asset")
+    bench.add_argument("--apply", action="store_true", help='write the recommended codec to iwf.json "compress"')
+    bench.set_defaults(run=_compression)
+
+    quant = sub.add_parser("quantize", help="preview a face with low-bpp fonts quantized")
+    quant.add_argument("face", help="face folder containing iwf.json and font.json")
+    quant.add_argument("--dither", choices=DITHER_MODES, default="none")
+    quant.add_argument("--bpp", type=int, choices=(1, 2, 4, 8), default=None, help="override every font's bpp")
+    quant.add_argument("--out", default=None, help="write the quantized preview PNG")
+    quant.set_defaults(run=_quantize)
+
+    comp = sub.add_parser("composite-bench", help="time straight vs premultiplied-alpha compositing")
+    comp.add_argument("face", help="face folder containing iwf.json")
+    comp.add_argument("--frames", type=int, default=50)
+    comp.set_defaults(run=_composite_bench)
+
+    diff = sub.add_parser("diff", help="compare two versions of a face structurally and visually")
+    diff.add_argument("old", help="original face folder")
+    diff.add_argument("new", help="changed face folder")
+    diff.add_argument("--tolerance", type=int, default=0, help="per-channel difference ignored per pixel")
+    diff.add_argument("--out", default=None, help="write side-by-side PNGs of the changed frames here")
+    diff.set_defaults(run=_diff)
+
+    lint = sub.add_parser("lint", help="check every asset a face references without decoding images")
+    lint.add_argument("face", help="face folder containing iwf.json")
+    lint.add_argument("--jobs", type=int, default=None, help="probe threads")
+    lint.set_defaults(run=_lint)
+
+    mig = sub.add_parser("migrate", help="convert legacy faces to the widgets/<type>/<font>/ layout")
+    mig.add_argument("faces", help="folder containing one sub-folder per face")
+    mig.add_argument("--apply", action="store_true", help="rewrite the faces (default: dry-run report)")
+    mig.add_argument("--keep-legacy", action="store_true", help="leave the old glyph folders in place")
+    mig.add_argument("--jobs", type=int, default=None, help="worker processes")
+    mig.set_defaults(run=_migrate)
+
+    srv = sub.add_parser("serve", help="serve rendered previews over local HTTP")
+    srv.add_argument("faces", help="folder containing one sub-folder per face")
+    srv.add_argument("--host", default="127.0.0.1")
+    srv.add_argument("--port", type=int, default=8765)
+    srv.add_argument("--workers", type=int, default=None, help="render threads")
+    srv.add_argument("--cache-size", type=int, default=256, help="rendered responses kept in memory")
+    srv.set_defaults(run=_serve)
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m wfeditor", description="IDW20 watch face tools")
+    add_profiles_option(parser)
+    add_commands(parser.add_subparsers(dest="command"))
+    args = parser.parse_args(argv)
+    if not args.command:
+        parser.print_help()
+        return 2
+    load_profiles_option(args)
+    return args.run(args)
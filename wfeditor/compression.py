@@ -0,0 +1,168 @@
+"""Asset compression codecs, a parallel compression stage and a codec benchmark"""
+import os, time
+from concurrent.futures import ThreadPoolExecutor
+
+from .startup import Image
+from .footprint import face_assets, encode_pixels
+from .profiles import get_device_profile
+
+def _lz4():
+    try:
+        import lz4.block
+        return lz4.block
+    except ImportError:
+        return None
+
+def lz4_available():
+    return _lz4() is not None
+
+def codec_levels():
+    """(codec, level) pairs this machine can run; level None is the codec's only setting"""
+    levels = [("NONE", None), ("ZLIB", 1), ("ZLIB", 6), ("ZLIB", 9),
+              ("BZ2", 1), ("BZ2", 9), ("LZMA", 0), ("LZMA", 6)]
+    if lz4_available():
+        levels[1:1] = [("LZ4", None), ("LZ4", 9)]  # fast mode, high-compression mode
+    return levels
+
+def compress_with(raw, codec, level=None):
+    import zlib, bz2, lzma
+    if codec == "NONE":
+        return raw
+    if codec == "LZ4":
+        block = _lz4()
+        if level:
+            return block.compress(raw, mode="high_compression", compression=level, store_size=False)
+        return block.compress(raw, store_size=False)
+    if codec == "ZLIB":
+        return zlib.compress(raw, 6 if level is None else level)
+    if codec == "BZ2":
+        return bz2.compress(raw, 9 if level is None else level)
+    if codec == "LZMA":
+        return lzma.compress(raw, preset=6 if level is None else level)
+    raise ValueError(f"unknown codec {codec}")
+
+def decompress_with(data, codec, raw_size):
+    import zlib, bz2, lzma
+    if codec == "NONE":
+        return data
+    if codec == "LZ4":
+        return _lz4().decompress(data, uncompressed_size=raw_size)
+    return {"ZLIB": zlib.decompress, "BZ2": bz2.decompress, "LZMA": lzma.decompress}[codec](data)
+
+# Rough watch-MCU throughput in MB/s: reading the stored bytes from external flash, then
+# decoding into RAM. Only good for ranking codecs against each other, not absolute timings.
+DEVICE_FLASH_MBPS = 20.0
+DEVICE_DECODE_MBPS = {"NONE": 200.0, "LZ4": 50.0, "ZLIB": 8.0, "BZ2": 0.8, "LZMA": 1.5}
+DECODE_BUDGET_MS = 20.0  # per asset; longer loads show up as a visible stall on screen change
+
+def device_decode_ms(codec, stored_size, raw_size):
+    return (stored_size / DEVICE_FLASH_MBPS + raw_size / DEVICE_DECODE_MBPS[codec]) / 1000.0
+
+def encoded_assets(model, profile=None):
+    """(kind, name, path, bpp, raw device bytes) of every distinct asset the face references"""
+    profile = profile or get_device_profile(model.data.get("deviceId"))
+    seen = set()
+    for kind, name, path, bpp, size in face_assets(model, profile):
+        if path in seen:
+            continue
+        seen.add(path)
+        try:
+            img = Image.open(path).convert("RGBA")
+        except (OSError, ValueError):
+            continue
+        if size and img.size != size:
+            img = img.resize(size, Image.BICUBIC)
+        yield kind, name, path, bpp, encode_pixels(img, bpp)
+
+def compress_assets(raws, codec, level=None, jobs=None):
+    """Compress many buffers across cores; zlib, bz2, lzma and lz4 release the GIL while they work"""
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        return list(pool.map(lambda raw: compress_with(raw, codec, level), raws))
+
+def compress_face(model, codec=None, level=None, profile=None, jobs=None):
+    """Every distinct asset encoded at its bpp and compressed with one codec (default: the face's "compress")"""
+    codec = (codec or model.data.get("compress") or "NONE").upper()
+    assets = list(encoded_assets(model, profile))
+    packed = compress_assets([a[4] for a in assets], codec, level, jobs)
+    return {"codec": codec, "level": level,
+            "assets": [(name, len(raw), len(data)) for (_, name, _, _, raw), data in zip(assets, packed)],
+            "raw": sum(len(a[4]) for a in assets), "size": sum(len(data) for data in packed)}
+
+def apply_recommendation(model, report):
+    """Set the face's "compress" codec to the benchmark's recommendation; returns the codec.
+
+    iwf.json stores only the codec name, so a recommended level applies to nothing on
+    the device and is dropped.
+    """
+    codec = report["recommended"][0]
+    model.data["compress"] = codec
+    return codec
+
+def _bench_asset(raw, levels):
+    results = []
+    for codec, level in levels:
+        start = time.perf_counter()
+        data = compress_with(raw, codec, level)
+        mid = time.perf_counter()
+        decompress_with(data, codec, len(raw))
+        end = time.perf_counter()
+        results.append({"codec": codec, "level": level, "size": len(data),
+                        "ratio": len(raw) / max(1, len(data)),
+                        "compress_ms": (mid - start) * 1000.0, "host_decode_ms": (end - mid) * 1000.0,
+                        "device_ms": device_decode_ms(codec, len(data), len(raw))})
+    return results
+
+def _recommend(results, budget_ms):
+    # Smallest output that still decodes within budget; otherwise whatever decodes fastest
+    fast = [r for r in results if r["device_ms"] <= budget_ms]
+    if fast:
+        return min(fast, key=lambda r: (r["size"], r["device_ms"]))
+    return min(results, key=lambda r: r["device_ms"])
+
+def benchmark_codecs(model, profile=None, jobs=None, budget_ms=DECODE_BUDGET_MS):
+    """Run every available codec and level over the face's assets, in parallel across assets"""
+    levels = codec_levels()
+    assets = list(encoded_assets(model, profile))
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        per_asset = list(pool.map(lambda a: _bench_asset(a[4], levels), assets))
+
+    report = {"levels": levels, "budget_ms": budget_ms, "assets": [], "totals": {}}
+    for (kind, name, path, bpp, raw), results in zip(assets, per_asset):
+        best = _recommend(results, budget_ms)
+        report["assets"].append({"kind": kind, "name": name, "bpp": bpp, "raw": len(raw),
+                                 "results": results, "recommended": (best["codec"], best["level"])})
+        for r in results:
+            total = report["totals"].setdefault((r["codec"], r["level"]),
+                                                {"size": 0, "compress_ms": 0.0, "device_ms": 0.0, "worst_ms": 0.0})
+            total["size"] += r["size"]
+            total["compress_ms"] += r["compress_ms"]
+            total["device_ms"] += r["device_ms"]
+            total["worst_ms"] = max(total["worst_ms"], r["device_ms"])
+    # iwf.json has one face-wide "compress" setting: smallest total whose slowest asset fits the budget
+    totals = [dict(t, codec=k[0], level=k[1]) for k, t in report["totals"].items()]
+    fits = [t for t in totals if t["worst_ms"] <= budget_ms] or totals
+    best = min(fits, key=lambda t: (t["size"], t["device_ms"]))
+    report["recommended"] = (best["codec"], best["level"])
+    return report
+
+def _setting(codec, level):
+    return codec if level is None else f"{codec}-{level}"
+
+def format_benchmark_report(report):
+    from .footprint import format_bytes
+    raw = sum(a["raw"] for a in report["assets"])
+    lines = [f'{len(report["assets"])} assets, {format_bytes(raw)} raw; device decode budget '
+             f'{report["budget_ms"]:.0f} ms per asset',
+             f'{"setting":10} {"size":>10} {"ratio":>6} {"compress":>10} {"device":>10} {"worst":>9}']
+    for (codec, level), t in report["totals"].items():
+        lines.append(f'{_setting(codec, level):10} {format_bytes(t["size"]):>10} '
+                     f'{raw / max(1, t["size"]):6.2f} {t["compress_ms"]:8.1f}ms {t["device_ms"]:8.1f}ms '
+                     f'{t["worst_ms"]:7.1f}ms')
+    lines.append(f'Recommended face setting: {_setting(*report["recommended"])}')
+    for a in report["assets"]:
+        r = next(r for r in a["results"] if (r["codec"], r["level"]) == a["recommended"])
+        lines.append(f'  {a["name"]}: {_setting(*a["recommended"])} '
+                     f'({format_bytes(a["raw"])} -> {format_bytes(r["size"])}, ~{r["device_ms"]:.1f} ms)')
+    if not lz4_available():
+        lines.append("(lz4 not installed; LZ4 not measured)")
+    return "\n".join(lines)
@@ -0,0 +1,164 @@
+"""Comparing two versions of a face: iwf.json items, font.json, assets and rendered frames"""
+import os, datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from .startup import Image
+from .golden import GOLDEN_TIMES
+from .model import load_face, file_digest
+from .package import Packager
+from .render import Renderer
+
+DIFF_TILE = 16  # changed pixels are grouped on a grid of this many pixels before boxing
+
+def _dict_changes(old, new):
+    # key -> (old value, new value) for every key whose value differs
+    return {k: (old.get(k), new.get(k)) for k in sorted(set(old) | set(new), key=str)
+            if old.get(k) != new.get(k)}
+
+def _keyed_items(items):
+    # Items have no ids; match them by (widget, type) and occurrence, which survives reordering
+    keyed, seen = {}, {}
+    for it in items:
+        base = (it.get("widget"), it.get("type"))
+        n = seen[base] = seen.get(base, -1) + 1
+        keyed[base + (n,)] = it
+    return keyed
+
+def diff_models(old, new):
+    """Structural differences between two models: face fields, items and fonts"""
+    fields = _dict_changes({k: v for k, v in old.data.items() if k != "item"},
+                           {k: v for k, v in new.data.items() if k != "item"})
+    a, b = _keyed_items(old.data.get("item", [])), _keyed_items(new.data.get("item", []))
+    items = {"added": [k for k in b if k not in a], "removed": [k for k in a if k not in b],
+             "changed": {k: _dict_changes(a[k], b[k]) for k in a if k in b and a[k] != b[k]}}
+    fa = {f.get("name"): f for f in old.font_data.get("item", []) if isinstance(f, dict)}
+    fb = {f.get("name"): f for f in new.font_data.get("item", []) if isinstance(f, dict)}
+    fonts = {"added": sorted(set(fb) - set(fa), key=str), "removed": sorted(set(fa) - set(fb), key=str),
+             "changed": {n: _dict_changes(fa[n], fb[n]) for n in fa if n in fb and fa[n] != fb[n]}}
+    return {"fields": fields, "items": items, "fonts": fonts}
+
+def diff_assets(old, new):
+    """Referenced asset files added, removed or changed, by archive name"""
+    a, b = dict(Packager(old).asset_files()), dict(Packager(new).asset_files())
+    changed = []
+    with ThreadPoolExecutor() as pool:
+        common = sorted(set(a) & set(b))
+        hashes = list(pool.map(lambda n: (file_digest(a[n]), file_digest(b[n])), common))
+    for name, (ha, hb) in zip(common, hashes):
+        if ha != hb:
+            changed.append(name)
+    return {"added": sorted(set(b) - set(a)), "removed": sorted(set(a) - set(b)), "changed": changed}
+
+def changed_boxes(old_img, new_img, tolerance=0, tile=DIFF_TILE):
+    """(changed pixel count, [(x0, y0, x1, y1), ...]) of the regions where two frames differ.
+
+    The per-pixel mask is reduced to a coarse tile grid in one numpy pass; neighbouring
+    changed tiles are grouped (the grid is tiny, so that part is cheap Python) and each
+    group's box is then tightened to the exact changed pixels.
+    """
+    import numpy as np
+    a = np.asarray(old_img.convert("RGBA"), dtype=np.int16)
+    b = np.asarray(new_img.convert("RGBA"), dtype=np.int16)
+    if a.shape != b.shape:
+        return a.shape[0] * a.shape[1], [(0, 0, max(a.shape[1], b.shape[1]), max(a.shape[0], b.shape[0]))]
+    mask = np.abs(a - b).max(axis=2) > tolerance
+    count = int(np.count_nonzero(mask))
+    if not count:
+        return 0, []
+    H, W = mask.shape
+    th, tw = -(-H // tile), -(-W // tile)
+    padded = np.zeros((th * tile, tw * tile), bool)
+    padded[:H, :W] = mask
+    tiles = padded.reshape(th, tile, tw, tile).any(axis=(1, 3))
+
+    boxes, seen = [], np.zeros_like(tiles)
+    for ty, tx in zip(*np.nonzero(tiles)):
+        if seen[ty, tx]:
+            continue
+        stack, group = [(ty, tx)], []
+        seen[ty, tx] = True
+        while stack:
+            y, x = stack.pop()
+            group.append((y, x))
+            for ny in (y - 1, y, y + 1):
+                for nx in (x - 1, x, x + 1):
+                    if 0 <= ny < th and 0 <= nx < tw and tiles[ny, nx] and not seen[ny, nx]:
+                        seen[ny, nx] = True
+                        stack.append((ny, nx))
+        ys, xs = zip(*group)
+        y0, y1 = min(ys) * tile, (max(ys) + 1) * tile
+        x0, x1 = min(xs) * tile, (max(xs) + 1) * tile
+        rows, cols = np.nonzero(mask[y0:y1, x0:x1])
+        boxes.append((x0 + int(cols.min()), y0 + int(rows.min()), x0 + int(cols.max()) + 1, y0 + int(rows.max()) + 1))
+    return count, boxes
+
+def diff_faces(old_dir, new_dir, times=None, tolerance=0):
+    """Structural, asset and rendered differences between two face folders"""
+    old, new = load_face(old_dir), load_face(new_dir)
+    times = [datetime.time(*map(int, t.split(":"))) for t in (times or GOLDEN_TIMES)]
+    report = diff_models(old, new)
+    report["assets"] = diff_assets(old, new)
+    report["frames"] = []
+    if (old.data == new.data and old.font_data == new.font_data
+            and not any(report["assets"].values())):
+        return report  # same model over byte-identical assets: nothing to render
+
+    def render_all(model):
+        renderer = Renderer(model)
+        return [renderer.render(t) for t in times]
+
+    # One renderer per face, each on its own thread
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        frames = list(pool.map(render_all, (old, new)))
+    for t, a, b in zip(times, *frames):
+        count, boxes = changed_boxes(a, b, tolerance)
+        report["frames"].append({"time": t, "changed": count, "boxes": boxes, "old": a, "new": b})
+    return report
+
+def _item_label(key):
+    widget, wtype, n = key
+    return f"{widget}/{wtype}" + (f" #{n + 1}" if n else "")
+
+def format_face_diff(report):
+    lines = []
+    for k, (a, b) in report["fields"].items():
+        lines.append(f"field {k}: {a!r} -> {b!r}")
+    items = report["items"]
+    lines += [f"item added: {_item_label(k)}" for k in items["added"]]
+    lines += [f"item removed: {_item_label(k)}" for k in items["removed"]]
+    for k, changes in items["changed"].items():
+        lines.append(f"item changed: {_item_label(k)}: " +
+                     ", ".join(f"{f} {a!r} -> {b!r}" for f, (a, b) in changes.items()))
+    fonts = report["fonts"]
+    lines += [f"font added: {n}" for n in fonts["added"]] + [f"font removed: {n}" for n in fonts["removed"]]
+    for n, changes in fonts["changed"].items():
+        lines.append(f"font changed: {n}: " + ", ".join(f"{f} {a!r} -> {b!r}" for f, (a, b) in changes.items()))
+    for kind in ("added", "removed", "changed"):
+        lines += [f"asset {kind}: {n}" for n in report["assets"][kind]]
+    if not report["frames"]:
+        lines.append("no changes; frames not rendered")
+    for f in report["frames"]:
+        boxes = " ".join(f"({x0},{y0})-({x1},{y1})" for x0, y0, x1, y1 in f["boxes"])
+        lines.append(f'{f["time"]}: ' + (f'{f["changed"]} px changed in {boxes}' if f["changed"] else "identical"))
+    return "\n".join(lines)
+
+def save_diff_images(report, out_dir):
+    """old | new side by side per sampled time, changed regions outlined in red on both"""
+    from PIL import ImageDraw
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for f in report["frames"]:
+        if not f["changed"]:
+            continue
+        a, b = f["old"], f["new"]
+        sheet = Image.new("RGBA", (a.size[0] + b.size[0] + 8, max(a.size[1], b.size[1])), (40, 40, 40, 255))
+        sheet.alpha_composite(a, (0, 0))
+        sheet.alpha_composite(b, (a.size[0] + 8, 0))
+        draw = ImageDraw.Draw(sheet)
+        for x0, y0, x1, y1 in f["boxes"]:
+            for dx in (0, a.size[0] + 8):
+                draw.rectangle((x0 + dx - 1, y0 - 1, x1 + dx, y1), outline=(255, 0, 0, 255))
+        path = os.path.join(out_dir, f'{f["time"].strftime("%H%M%S")}.png')
+        sheet.save(path)
+        paths.append(path)
+    return paths
@@ -0,0 +1,145 @@
+"""Generating and reconciling font.json from the glyph folders on disk"""
+import os, filecmp
+from concurrent.futures import ThreadPoolExecutor
+
+from .startup import Image
+from .assets import find_glyph_folder
+
+DEFAULT_FONT_BPP = 16
+
+def _png_files(path):
+    with os.scandir(path) as entries:
+        return sorted(e.path for e in entries if e.is_file() and e.name.lower().endswith(".png"))
+
+def _is_compat_copy(folder, subfolders):
+    # The editor also copies each font's glyphs into widgets/[widget_type]/ for old readers
+    files = _png_files(folder)
+    if not files or not subfolders:
+        return False
+    for path in files:
+        name = os.path.basename(path)
+        if not any(os.path.isfile(os.path.join(sub, name)) and
+                   filecmp.cmp(path, os.path.join(sub, name), shallow=False) for sub in subfolders):
+            return False
+    return True
+
+def glyph_set_folders(root, used=()):
+    """(font name, folder) for every glyph set under widgets/ and fonts/, in glyph_folder_candidates order.
+
+    An old-style widgets/[widget_type]/ holding PNGs directly counts only when it is in
+    used (folders items resolve to) or is not just a copy of its font sub-folders.
+    """
+    found = []
+    used = {os.path.normcase(os.path.abspath(f)) for f in used}
+    widgets = os.path.join(root, "widgets")
+    if os.path.isdir(widgets):
+        for wtype in sorted(os.scandir(widgets), key=lambda e: e.name):
+            if not wtype.is_dir():
+                continue
+            # widgets/[widget_type]/[font_name]/, or the old widgets/[widget_type]/ holding PNGs directly
+            subfolders = []
+            for font in sorted(os.scandir(wtype.path), key=lambda e: e.name):
+                if font.is_dir():
+                    found.append((font.name, font.path))
+                    subfolders.append(font.path)
+            if (os.path.normcase(os.path.abspath(wtype.path)) in used
+                    or not _is_compat_copy(wtype.path, subfolders)):
+                found.append((wtype.name, wtype.path))
+    fonts = os.path.join(root, "fonts")
+    if os.path.isdir(fonts):
+        for font in sorted(os.scandir(fonts), key=lambda e: e.name):
+            if font.is_dir():
+                found.append((font.name, font.path))
+    return found
+
+def infer_bpp(colors):
+    """Smallest palette depth holding every color used, else the direct-color default"""
+    if colors is None:
+        return DEFAULT_FONT_BPP
+    for bpp in (1, 2, 4, 8):
+        if colors <= 2 ** bpp:
+            return bpp
+    return DEFAULT_FONT_BPP
+
+def measure_glyph_set(folder):
+    """Glyph count, cell size and inferred bpp of one glyph folder; None if it holds no PNGs"""
+    files = _png_files(folder)
+    if not files:
+        return None
+    w = h = 0
+    sizes = set()
+    palette = set()
+    for path in files:
+        with Image.open(path) as img:
+            sizes.add(img.size)
+            w, h = max(w, img.size[0]), max(h, img.size[1])
+            if palette is not None:
+                colors = img.convert("RGBA").getcolors(256)
+                if colors is None:
+                    palette = None  # more than 256 colors in one glyph already
+                else:
+                    palette.update(c for _, c in colors)
+                    if len(palette) > 256:
+                        palette = None
+    return {"folder": folder, "glyphs": len(files), "size": (w, h),
+            "proportional": len(sizes) > 1,
+            "colors": None if palette is None else len(palette),
+            "bpp": infer_bpp(None if palette is None else len(palette))}
+
+def reconcile_font_data(model, root=None, jobs=None, update_bpp=False):
+    """Add a font.json entry for every glyph set on disk in one pass.
+
+    Existing entries keep their bpp unless update_bpp is set; entries with no glyph
+    folder are reported as stale but left in place. A folder an item resolves to is
+    named after that item's font.
+    """
+    root = root or model.assets.index.root_path()
+    fonts_by_folder = {}
+    for it in model.data.get("item", []):
+        if it.get("widget") == "custom" and it.get("font"):
+            folder = find_glyph_folder(it.get("type", ""), it["font"], model.assets.index)
+            if folder:
+                fonts_by_folder.setdefault(os.path.normcase(os.path.abspath(folder)), it["font"])
+    folders = [(fonts_by_folder.get(os.path.normcase(os.path.abspath(f)), name), f)
+               for name, f in glyph_set_folders(root, fonts_by_folder)]
+    with ThreadPoolExecutor(max_workers=jobs or min(8, (os.cpu_count() or 1) * 2)) as pool:
+        measured = list(pool.map(measure_glyph_set, [f for _, f in folders]))
+
+    sets = {}
+    for (name, _), info in zip(folders, measured):
+        if info is not None and name not in sets:
+            sets[name] = info  # first folder wins, matching find_glyph_folder's priority
+
+    items = model.font_data.setdefault("item", [])
+    existing = {it.get("name", ""): it for it in items if isinstance(it, dict)}
+    report = {"sets": sets, "added": [], "updated": [], "mismatched": [],
+              "stale": sorted(n for n in existing if n and n not in sets)}
+    for name, info in sets.items():
+        entry = existing.get(name)
+        if entry is None:
+            entry = {"name": name, "bpp": info["bpp"], "format": "png"}
+            items.append(entry)
+            existing[name] = entry
+            report["added"].append(name)
+        elif entry.get("bpp") != info["bpp"]:
+            if update_bpp:
+                entry["bpp"] = info["bpp"]
+                model.changed(entry)
+                report["updated"].append(name)
+            else:
+                report["mismatched"].append(name)
+    return report
+
+def format_font_report(report):
+    sets = report["sets"]
+    lines = [f'{len(sets)} glyph sets found, {len(report["added"])} added, '
+             f'{len(report["updated"])} bpp updated']
+    for name, info in sets.items():
+        state = ("added" if name in report["added"] else "updated" if name in report["updated"]
+                 else "bpp differs" if name in report["mismatched"] else "ok")
+        kind = "proportional" if info["proportional"] else "fixed"
+        lines.append(f'  {name}: {info["glyphs"]} glyphs, {info["size"][0]}x{info["size"][1]} {kind}, '
+                     f'{info["bpp"]} bpp ({state})')
+    for name in report["stale"]:
+        lines.append(f'  {name}: no glyph folder (stale)')
+    return "\n".join(lines)
@@ -0,0 +1,158 @@
+"""On-device RAM and flash footprint estimates"""
+import os, json
+
+from .startup import Image
+from .assets import find_glyph_folder
+from .profiles import get_device_profile
+
+def storage_bpp(bpp):
+    """Depth a bpp is stored at: a 1, 2, 4 or 8-bit palette, RGB565, RGB888 or RGBA8888"""
+    for depth in (1, 2, 4, 8, 16, 24):
+        if bpp <= depth:
+            return depth
+    return 32
+
+def encode_pixels(img, bpp):
+    """Raw pixel bytes of an RGBA image as stored on the device at the given bpp"""
+    import numpy as np
+    bpp = storage_bpp(bpp)
+    if bpp == 32:
+        return img.tobytes()
+    if bpp == 24:
+        return img.convert("RGB").tobytes()
+    if bpp == 16:
+        a = np.asarray(img.convert("RGB"), dtype=np.uint16)
+        rgb565 = ((a[..., 0] >> 3) << 11) | ((a[..., 1] >> 2) << 5) | (a[..., 2] >> 3)
+        return rgb565.astype("<u2").tobytes()
+    # Palette formats: 2**bpp colors, indices packed MSB first, rows padded to a byte
+    indices = np.asarray(img.quantize(colors=2 ** bpp), dtype=np.uint8)
+    bits = np.unpackbits(indices[..., None], axis=2)[..., 8 - bpp:]
+    return np.packbits(bits.reshape(indices.shape[0], -1), axis=1).tobytes()
+
+def compress_bytes(raw, codec):
+    """Compress with the iwf "compress" codec; returns (data, exact) where exact is False for a stand-in"""
+    from .compression import compress_with, lz4_available
+    codec = (codec or "").upper()
+    if codec in ("", "NONE"):
+        return raw, True
+    if codec == "LZ4":
+        if lz4_available():
+            return compress_with(raw, "LZ4"), True
+        # Fast zlib is the closest stdlib match for LZ4's ratio class
+        return compress_with(raw, "ZLIB", 1), False
+    return compress_with(raw, "ZLIB", 9), codec in ("ZLIB", "DEFLATE")
+
+def ram_bytes(size, bpp):
+    w, h = size
+    bpp = storage_bpp(bpp)
+    return (w * bpp + 7) // 8 * h
+
+def face_assets(model, profile):
+    """(kind, name, path, bpp, stored size or None for the file's own size) of every asset a face references"""
+    d = model.data
+    index = model.assets.index
+    # Unresolved names are passed through as paths, which the callers report as missing
+    if d.get("bkground"):
+        path = index.resolve_file(d["bkground"]) or d["bkground"]
+        yield "background", d["bkground"], path, profile.bpp, profile.canvas_size
+    for it in d.get("item", []):
+        if it.get("widget") == "watch" and it.get("type") == "time":
+            for key in ("hour", "minute", "second"):
+                if it.get(key):
+                    yield "hand", key, index.resolve_file(it[key]) or it[key], profile.bpp, None
+        elif it.get("widget") == "custom":
+            font_name = it.get("font", "")
+            folder = find_glyph_folder(it.get("type", ""), font_name, model.assets.index)
+            if not folder or not os.path.isdir(folder):
+                continue
+            bpp = model.font_bpp(font_name) or profile.bpp
+            for entry in sorted(os.scandir(folder), key=lambda e: e.name):
+                if entry.is_file() and entry.name.lower().endswith(".png"):
+                    yield "glyph", f"{font_name}/{entry.name}", entry.path, bpp, None
+
+class FootprintAnalyzer:
+    """Estimates decoded RAM and encoded flash use of every asset a face references"""
+
+    def __init__(self, model, profile=None):
+        self.m = model
+        self.profile = profile
+        self._flash_cache = {}  # (abs path, mtime_ns, size, w, h, bpp, codec) -> (bytes, exact)
+
+    def _flash(self, path, size, bpp, codec):
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_mtime_ns, st.st_size, size, bpp, codec)
+        cached = self._flash_cache.get(key)
+        if cached is None:
+            img = Image.open(path).convert("RGBA")
+            if img.size != size:
+                img = img.resize(size, Image.BICUBIC)
+            data, exact = compress_bytes(encode_pixels(img, bpp), codec)
+            cached = self._flash_cache[key] = (len(data), exact)
+        return cached
+
+    def analyze(self, flash_budget=None, ram_budget=None):
+        profile = self.profile or get_device_profile(self.m.data.get("deviceId"))
+        codec = self.m.data.get("compress", "")
+        report = {"assets": [], "missing": [], "exact": True, "codec": codec,
+                  "flash_budget": flash_budget or profile.flash_budget,
+                  "ram_budget": ram_budget or profile.ram_budget}
+        seen = set()
+        assets = []
+        for kind, name, path, bpp, size in face_assets(self.m, profile):
+            if path in seen:
+                continue
+            seen.add(path)
+            try:
+                with Image.open(path) as probe:  # header only
+                    size = size or probe.size
+            except (OSError, ValueError):
+                report["missing"].append(path)
+                continue
+            assets.append((kind, name, path, bpp, size))
+
+        def flash(asset):
+            try:
+                return self._flash(asset[2], asset[4], asset[3], codec)
+            except (OSError, ValueError):
+                return None
+        # Encode and compress across cores; PIL, numpy and the codecs release the GIL
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+            results = list(pool.map(flash, assets))
+        for (kind, name, path, bpp, size), result in zip(assets, results):
+            if result is None:
+                report["missing"].append(path)
+                continue
+            report["exact"] &= result[1]
+            report["assets"].append({"kind": kind, "name": name, "path": path, "size": size,
+                                     "bpp": bpp, "ram": ram_bytes(size, bpp), "flash": result[0]})
+        # iwf.json and font.json travel with the assets
+        meta = len(json.dumps(self.m.data, ensure_ascii=False, indent=4).encode("utf-8"))
+        meta += len(json.dumps(self.m.font_data, ensure_ascii=False, separators=(',', ':')).encode("utf-8"))
+        report["ram"] = sum(a["ram"] for a in report["assets"])
+        report["flash"] = sum(a["flash"] for a in report["assets"]) + meta
+        return report
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB"):
+        if n < 1024 or unit == "MB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024.0
+
+def format_footprint(report, top=5):
+    lines = []
+    for label, key in (("Flash", "flash"), ("RAM", "ram")):
+        line = f"{label}: {format_bytes(report[key])}"
+        budget = report[key + "_budget"]
+        if budget:
+            pct = report[key] * 100.0 / budget
+            line += f" / {format_bytes(budget)} ({pct:.0f}%)" + ("  OVER BUDGET" if pct > 100 else "")
+        lines.append(line)
+    if not report["exact"]:
+        lines.append(f'(flash estimated; no {report["codec"]} codec installed)')
+    largest = sorted(report["assets"], key=lambda a: a["flash"], reverse=True)[:top]
+    for a in largest:
+        lines.append(f'  {a["name"]}: {format_bytes(a["flash"])} flash, {format_bytes(a["ram"])} RAM @ {a["bpp"]}bpp')
+    if report["missing"]:
+        lines.append(f'{len(report["missing"])} referenced assets missing')
+    return "\n".join(lines)
@@ -0,0 +1,104 @@
+"""Golden-image regression checks over a corpus of faces"""
+import os, json, datetime
+
+from .startup import Image
+from .model import WatchFaceModel
+from .render import Renderer
+
+# Cases rendered for every face unless its golden.json lists its own
+GOLDEN_TIMES = ["10:08:36", "00:00:00", "06:30:15", "23:59:59"]
+
+def _golden_cases(face_dir):
+    times, widget_values = GOLDEN_TIMES, {}
+    config = os.path.join(face_dir, "golden.json")
+    if os.path.exists(config):
+        with open(config, "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+        times = cfg.get("times", times)
+        widget_values = cfg.get("widget_values", widget_values)
+    return [(t.replace(":", ""), datetime.time(*map(int, t.split(":")))) for t in times], widget_values
+
+def diff_images(golden, actual, tolerance=0):
+    """Per-pixel max channel difference; returns (changed pixel count, max diff, heatmap image)"""
+    import numpy as np
+    a = np.asarray(golden.convert("RGBA"), dtype=np.int16)
+    b = np.asarray(actual.convert("RGBA"), dtype=np.int16)
+    if a.shape != b.shape:
+        return a.shape[0] * a.shape[1], 255, None
+    delta = np.abs(a - b).max(axis=2)
+    changed = int(np.count_nonzero(delta > tolerance))
+    max_diff = int(delta.max())
+    # Heatmap: dimmed golden in gray, differing pixels in red scaled by magnitude
+    gray = (a[..., :3].mean(axis=2) * 0.3).astype(np.uint8)
+    heat = np.stack([gray, gray, gray], axis=2)
+    mask = delta > tolerance
+    heat[mask, 0] = np.clip(128 + delta[mask] // 2, 0, 255)
+    heat[mask, 1] = 0
+    heat[mask, 2] = 0
+    return changed, max_diff, Image.fromarray(heat, "RGB")
+
+def check_golden_face(face_dir, tolerance=0, max_pixels=0, update=False, check_trim=False):
+    """Render one face at its golden cases and compare (or rewrite) the stored PNGs.
+
+    With check_trim every case is also rendered from the untrimmed hand PNGs, and any
+    pixel that differs from the trimmed render fails the case.
+    """
+    face_dir = os.path.abspath(face_dir)
+    # Asset paths in iwf.json are relative to the face folder
+    os.chdir(face_dir)
+    model = WatchFaceModel()
+    model.load_json("iwf.json")
+    renderer = Renderer(model)
+    reference = Renderer(model)
+    reference.trim_hands = False
+    cases, widget_values = _golden_cases(face_dir)
+    for key, value in widget_values.items():
+        renderer.update_widget_value(key, value)
+        reference.update_widget_value(key, value)
+
+    golden_dir = os.path.join(face_dir, "golden")
+    results = []
+    for name, when in cases:
+        img = renderer.render(when)
+        golden_path = os.path.join(golden_dir, f"{name}.png")
+        result = {"face": face_dir, "case": name, "changed": 0, "max_diff": 0}
+        if update or not os.path.exists(golden_path):
+            os.makedirs(golden_dir, exist_ok=True)
+            img.save(golden_path)
+            result["status"] = "updated" if update else "new"
+        else:
+            changed, max_diff, heatmap = diff_images(Image.open(golden_path), img, tolerance)
+            result.update(changed=changed, max_diff=max_diff)
+            result["status"] = "ok" if changed <= max_pixels else "FAIL"
+            if result["status"] == "FAIL":
+                diff_dir = os.path.join(golden_dir, "diff")
+                os.makedirs(diff_dir, exist_ok=True)
+                img.save(os.path.join(diff_dir, f"{name}_actual.png"))
+                if heatmap is not None:
+                    heatmap.save(os.path.join(diff_dir, f"{name}_heatmap.png"))
+        results.append(result)
+        if check_trim:
+            changed, max_diff, _ = diff_images(reference.render(when), img)
+            results.append({"face": face_dir, "case": f"{name} untrimmed", "changed": changed,
+                            "max_diff": max_diff, "status": "FAIL" if changed else "ok"})
+    return results
+
+def _check_golden_face_safe(args):
+    face_dir, tolerance, max_pixels, update, check_trim = args
+    try:
+        return check_golden_face(face_dir, tolerance, max_pixels, update, check_trim)
+    except Exception as e:
+        return [{"face": os.path.abspath(face_dir), "case": "-", "status": "ERROR", "error": str(e),
+                 "changed": 0, "max_diff": 0}]
+
+def run_golden_corpus(corpus_dir, tolerance=0, max_pixels=0, update=False, jobs=None, check_trim=False):
+    """Check every face folder (one containing iwf.json) of a corpus across processes"""
+    from concurrent.futures import ProcessPoolExecutor
+    faces = sorted(entry.path for entry in os.scandir(corpus_dir)
+                   if entry.is_dir() and os.path.exists(os.path.join(entry.path, "iwf.json")))
+    work = [(face, tolerance, max_pixels, update, check_trim) for face in faces]
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for face_results in pool.map(_check_golden_face_safe, work):
+            results.extend(face_results)
+    return results
@@ -0,0 +1,129 @@
+"""Checking every asset a face references, from image headers only"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .startup import Image
+from .assets import HAND_KEYS, GLYPH_SPECIAL_CHARS, find_glyph_folder
+from .fonts import glyph_set_folders
+from .profiles import get_device_profile
+from .validation import validate_iwf_data, validate_font_data
+
+ERROR, WARNING = "error", "warning"
+
+# Characters each custom widget can show on the device, as the renderer draws them
+DIGITS = "0123456789"
+WIDGET_CHARS = {
+    "time": DIGITS + ":", "date": DIGITS + "/", "day": DIGITS, "second": DIGITS,
+    "hour": DIGITS, "min": DIGITS, "year": DIGITS, "heartrate": DIGITS,
+    "calorie": DIGITS, "distance": DIGITS + ".", "step": DIGITS, "battery": DIGITS + "%",
+    "weather": DIGITS + "o", "apm": "APM",
+    "week": "",  # day names; the renderer has no letter glyph files, so only the folder is checked
+}
+WIDGET_UNIT_CHARS = {"weather": "CF"}  # at least one of these is needed
+FONT_BPPS = (1, 2, 4, 8, 16)
+
+# character -> glyph file name without .png
+_GLYPH_FILES = {c: c for c in DIGITS}
+_GLYPH_FILES.update((char, name) for name, char in GLYPH_SPECIAL_CHARS.items() if len(char) == 1)
+
+def probe_image(path):
+    """(size, mode) read from the file header; Image.open does not decode pixel data"""
+    with Image.open(path) as img:
+        return img.size, img.mode
+
+def lint_face(model, profile=None, jobs=None):
+    """Problems with the assets a face references: a list of (severity, where, message).
+
+    Paths are gathered in one pass over iwf.json, every image header is probed on a
+    thread pool, and the checks then run on the probed sizes and modes.
+    """
+    profile = profile or get_device_profile(model.data.get("deviceId"))
+    index = model.assets.index
+    index.refresh_if_stale()
+    problems = [(ERROR, "iwf.json", p) for p in validate_iwf_data(model.data)]
+    if model.font_data.get("item") is not None:
+        problems += [(ERROR, "font.json", p) for p in validate_font_data(model.font_data)]
+    if problems:
+        return problems
+    d = model.data
+    checks = []  # (where, path, check(size, mode) -> [(severity, message)])
+
+    def need_file(where, name, check):
+        path = index.resolve_file(name)
+        if path:
+            checks.append((where, path, check))
+        else:
+            problems.append((ERROR, where, f"{name} not found"))
+
+    W, H = profile.canvas_size
+    if d.get("bkground"):
+        need_file("background", d["bkground"], lambda size, mode: [] if size == (W, H) else
+                  [(WARNING, f"{size[0]}x{size[1]}, scaled to the {W}x{H} canvas on every render")])
+
+    fonts = {f.get("name"): f for f in model.font_data.get("item", [])}
+    used_fonts = set()
+    for i, it in enumerate(d.get("item", [])):
+        widget, wtype = it.get("widget"), it.get("type")
+        if (widget, wtype) == ("watch", "time"):
+            for key in HAND_KEYS:
+                if not it.get(key):
+                    continue
+                def hand_check(size, mode):
+                    if "A" in mode or mode == "P":
+                        return []
+                    return [(WARNING, f"mode {mode} has no alpha; the hand draws as a solid rectangle")]
+                need_file(f"item {i} {key} hand", it[key], hand_check)
+        elif widget == "custom" and wtype in WIDGET_CHARS:
+            where = f"item {i} {wtype}"
+            font = it.get("font", "")
+            used_fonts.add(font)
+            if fonts and font not in fonts:
+                problems.append((WARNING, where, f'font "{font}" has no font.json entry'))
+            folder = find_glyph_folder(wtype, font, index)
+            if not folder:
+                problems.append((ERROR, where, f'no glyph folder for font "{font}"'))
+                continue
+            missing = []
+            for char in WIDGET_CHARS[wtype]:
+                path = index.resolve_in(folder, f"{_GLYPH_FILES[char]}.png")
+                if path:
+                    h = it.get("h")
+                    checks.append((f"{where} glyph {char!r}", path, lambda size, mode, h=h:
+                                   [(WARNING, f"{size[1]}px tall, taller than the widget's {h}px")]
+                                   if h and size[1] > h else []))
+                else:
+                    missing.append(char)
+            units = WIDGET_UNIT_CHARS.get(wtype, "")
+            if units and not any(index.resolve_in(folder, f"{_GLYPH_FILES[c]}.png") for c in units):
+                missing.append("/".join(units))
+            if missing:
+                problems.append((ERROR, where, f"{os.path.relpath(folder, index.root_path())} has no glyph for "
+                                 + " ".join(repr(c) for c in missing)))
+
+    on_disk = {name for name, _ in glyph_set_folders(index.root_path())}
+    for name, entry in fonts.items():
+        if entry.get("bpp") not in FONT_BPPS:
+            problems.append((ERROR, f"font {name}", f'bpp {entry.get("bpp")!r} is not one of {FONT_BPPS}'))
+        if name not in on_disk and name not in used_fonts:
+            problems.append((WARNING, f"font {name}", "no glyph folder and no widget uses it"))
+
+    def run(check):
+        where, path, fn = check
+        try:
+            size, mode = probe_image(path)
+        except (OSError, ValueError) as e:
+            return [(ERROR, where, f"unreadable image: {e}")]
+        return [(severity, where, message) for severity, message in fn(size, mode)]
+
+    with ThreadPoolExecutor(max_workers=jobs or min(8, (os.cpu_count() or 1) * 2)) as pool:
+        for found in pool.map(run, checks):
+            problems += found
+    return problems
+
+def format_lint_report(problems):
+    if not problems:
+        return "no problems found"
+    lines = [f"{severity}: {where}: {message}" for severity, where, message in problems]
+    errors = sum(1 for p in problems if p[0] == ERROR)
+    lines.append(f"{errors} errors, {len(problems) - errors} warnings")
+    return "\n".join(lines)
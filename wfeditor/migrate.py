@@ -0,0 +1,170 @@
+"""Converting faces in legacy glyph layouts to widgets/<type>/<font>/"""
+import os, shutil
+
+from .assets import HAND_KEYS, glyph_folder_candidates
+from .fonts import measure_glyph_set
+from .model import WatchFaceModel, load_face
+
+def _png_names(folder):
+    with os.scandir(folder) as entries:
+        return sorted(e.name for e in entries if e.is_file() and e.name.lower().endswith(".png"))
+
+def _rel(path, root):
+    return os.path.relpath(path, root).replace(os.sep, "/")
+
+def _glyph_source(wtype, font, index):
+    # Like find_glyph_folder, but skips a widgets/<type>/ that only holds font sub-folders
+    for candidate in glyph_folder_candidates(wtype, font):
+        folder = index.resolve_dir(candidate)
+        if folder and _png_names(folder):
+            return os.path.abspath(folder)
+    return None
+
+def plan_face_migration(face_dir):
+    """Everything migrate_face would do to one face, without touching the disk.
+
+    Glyphs found through a legacy candidate (widgets/<type>/ holding PNGs directly,
+    fonts/<font>/ or a bare <font>/ folder) are copied to widgets/<type>/<font>/; the
+    legacy copies are removed afterwards. Asset names in iwf.json become face-relative
+    with forward slashes, missing top-level keys get the editor defaults, and font.json
+    gets one {"item": [...]} entry per font in use.
+    """
+    root = os.path.abspath(face_dir)
+    model = load_face(root)
+    index = model.assets.index
+    plan = {"face": root, "copies": [], "conflicts": [], "remove": [], "missing": [],
+            "renamed": [], "added_keys": [], "added_fonts": [],
+            "normalized_fonts": [], "model": model}
+
+    sources = {}  # legacy folder -> glyph names copied out of it
+    planned, kept = set(), set()
+    for it in model.data.get("item", []):
+        if it.get("widget") != "custom" or not it.get("font"):
+            continue
+        wtype, font = it.get("type", ""), it["font"]
+        target = os.path.join(root, "widgets", wtype, font)
+        folder = _glyph_source(wtype, font, index)
+        if folder is None:
+            if f"{wtype}/{font}" not in plan["missing"]:
+                plan["missing"].append(f"{wtype}/{font}")
+            continue
+        if os.path.normcase(folder) == os.path.normcase(target):
+            continue
+        names = _png_names(folder)
+        sources.setdefault(folder, set()).update(names)
+        for name in names:
+            dst = os.path.join(target, name)
+            if dst in planned:
+                continue
+            planned.add(dst)
+            if os.path.exists(dst):
+                plan["conflicts"].append(_rel(dst, root))  # already migrated by hand; both kept
+                kept.add(folder)
+            else:
+                plan["copies"].append((os.path.join(folder, name), dst))
+    for folder, names in sorted(sources.items()):
+        if folder not in kept:
+            plan["remove"] += [os.path.join(folder, n) for n in sorted(names)]
+
+    d = model.data
+    for key, value in WatchFaceModel().data.items():
+        if key not in d and key not in ("item", "bkground"):
+            d[key] = value
+            plan["added_keys"].append(key)
+    named = [(d, "bkground")] + [(it, key) for it in d.get("item", [])
+                                 if it.get("widget") == "watch" and it.get("type") == "time"
+                                 for key in HAND_KEYS]
+    for owner, key in named:
+        name = owner.get(key)
+        path = index.resolve_file(name) if name else None
+        if path and os.path.abspath(path).startswith(root + os.sep):
+            rel = _rel(os.path.abspath(path), root)
+            if rel != name:
+                plan["renamed"].append((name, rel))
+                owner[key] = rel
+
+    fonts = model.font_data.setdefault("item", [])
+    known = {f.get("name") for f in fonts if isinstance(f, dict)}
+    for f in fonts:
+        if isinstance(f, dict) and "format" not in f:
+            f["format"] = "png"
+            plan["normalized_fonts"].append(f.get("name"))
+    for it in d.get("item", []):
+        font = it.get("font")
+        if it.get("widget") != "custom" or not font or font in known:
+            continue
+        folder = _glyph_source(it.get("type", ""), font, index)
+        info = measure_glyph_set(folder) if folder else None
+        if info is not None:
+            fonts.append({"name": font, "bpp": info["bpp"], "format": "png"})
+            known.add(font)
+            plan["added_fonts"].append(font)
+    return plan
+
+def migrate_face(face_dir, apply=False, keep_legacy=False):
+    """Plan one face's migration and, with apply, carry it out; returns the plan"""
+    plan = plan_face_migration(face_dir)
+    if apply:
+        for src, dst in plan["copies"]:
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(src, dst)
+        if not keep_legacy:
+            for path in plan["remove"]:
+                os.remove(path)
+            # Drop legacy folders left empty, innermost first
+            for folder in sorted({os.path.dirname(p) for p in plan["remove"]}, key=len, reverse=True):
+                while folder != plan["face"] and os.path.isdir(folder) and not os.listdir(folder):
+                    os.rmdir(folder)
+                    folder = os.path.dirname(folder)
+        model = plan["model"]
+        model.save_json(os.path.join(plan["face"], "iwf.json"))
+        model.save_font_json(os.path.join(plan["face"], "font.json"))
+    plan["applied"] = apply
+    del plan["model"]  # keeps the result small enough to send back from a worker process
+    return plan
+
+def _migrate_face_safe(args):
+    face_dir, apply, keep_legacy = args
+    try:
+        return migrate_face(face_dir, apply, keep_legacy)
+    except Exception as e:
+        return {"face": os.path.abspath(face_dir), "error": str(e)}
+
+def migrate_corpus(corpus_dir, apply=False, keep_legacy=False, jobs=None):
+    """Migrate every face folder (one containing iwf.json) of a directory across processes"""
+    from concurrent.futures import ProcessPoolExecutor
+    faces = sorted(entry.path for entry in os.scandir(corpus_dir)
+                   if entry.is_dir() and os.path.exists(os.path.join(entry.path, "iwf.json")))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_migrate_face_safe, [(face, apply, keep_legacy) for face in faces]))
+
+_CHANGES = ("copies", "renamed", "added_keys", "added_fonts", "normalized_fonts")
+
+def format_migration_report(plans):
+    lines = []
+    for p in plans:
+        name = os.path.basename(p["face"])
+        if "error" in p:
+            lines.append(f'{name}: ERROR {p["error"]}')
+            continue
+        moves = {}
+        for src, dst in p["copies"]:
+            key = (_rel(os.path.dirname(src), p["face"]), _rel(os.path.dirname(dst), p["face"]))
+            moves[key] = moves.get(key, 0) + 1
+        changes = [f"  {src}/ -> {dst}/ ({n} glyphs)" for (src, dst), n in sorted(moves.items())]
+        changes += [f"  {old} -> {new}" for old, new in p["renamed"]]
+        if p["added_keys"]:
+            changes.append(f'  iwf.json: added {", ".join(p["added_keys"])}')
+        if p["added_fonts"]:
+            changes.append(f'  font.json: added {", ".join(p["added_fonts"])}')
+        if p["normalized_fonts"]:
+            changes.append(f'  font.json: added "format" to {", ".join(map(str, p["normalized_fonts"]))}')
+        notes = [f"  {path} exists, kept" for path in p["conflicts"]]
+        notes += [f"  no glyph folder for {m}" for m in p["missing"]]
+        state = ("migrated" if p["applied"] else "would change") if changes else "up to date"
+        lines.append(f"{name}: {state}")
+        lines += changes + notes
+    applied = any(p.get("applied") for p in plans)
+    changed = sum(1 for p in plans if "error" not in p and any(p[k] for k in _CHANGES))
+    lines.append(f'{len(plans)} faces, {changed} {"migrated" if applied else "to migrate (dry run)"}')
+    return "\n".join(lines)
@@ -0,0 +1,172 @@
+"""The iwf.json / font.json document model"""
+import os, copy, json, hashlib
+
+from .assets import AssetManager, referenced_asset_paths
+
+def _digest(obj):
+    doc = json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha1(doc.encode("utf-8")).digest()
+
+def file_digest(path):
+    """sha1 of a file's bytes, read in 1 MB chunks"""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.digest()
+
+class WatchFaceModel:
+    def __init__(self):
+        self.data = {
+            "version": 1,
+            "clouddialversion": 3,
+            "preview": "preview.png",
+            "name": "customiwf",
+            "author": "you",
+            "description": "IDW20",
+            "deviceId": "IDW20",
+            "bluetooth": False,
+            "disturb": False,
+            "battery": False,
+            "compress": "LZ4",
+            "environment": "Production",
+            "item": [],
+            "bkground": "files0.png"
+        }
+        self.assets = AssetManager()
+        self.font_json_path = None
+        self.font_data = {"item": []}  # Initialize with empty font data
+        self._digests = {}  # id(item or font entry) -> (entry, deep copy when hashed, canonical digest)
+        self._file_digests = {}  # asset path -> (mtime_ns, size, content digest)
+        self._asset_files = (None, [])  # (key, [(name, path)]) of the last asset listing
+
+    # === JSON/IWF ===
+    def load_json(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            self.data = json.load(f)
+
+    def save_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=4)
+    
+    # === Font JSON ===
+    def load_font_json(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        # Older tools wrote a bare list of font entries
+        if isinstance(data, list):
+            data = {"item": data}
+        self.font_json_path = path
+        self.font_data = data
+
+    def save_font_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            # Compact format for font.json (no spaces)
+            json.dump(self.font_data, f, ensure_ascii=False, separators=(',', ':'))
+
+    def font_bpp(self, font_name):
+        """bpp of a font.json entry; None when the font has no entry or its bpp is malformed"""
+        for f in self.font_data.get("item", []):
+            if isinstance(f, dict) and f.get("name") == font_name:
+                try:
+                    return int(f.get("bpp", 16))
+                except (TypeError, ValueError):
+                    return None
+        return None
+
+    # === Canonical hash ===
+    def changed(self, entry=None):
+        """Rehash one item or font entry (None: every entry) on the next content_hash.
+
+        Edits are found without this (see content_hash); it is only needed when a value
+        is swapped for an equal one of another type, such as 1 for 1.0 or True.
+        """
+        if entry is None:
+            self._digests.clear()
+        else:
+            self._digests.pop(id(entry), None)
+
+    def _entry_digest(self, entry):
+        # Comparing against the copy taken when it was hashed is a C-level walk, far cheaper
+        # than serializing, and catches edits made in place by callers that never said so
+        cached = self._digests.get(id(entry))
+        if cached is not None and cached[0] is entry and cached[1] == entry:
+            return cached[2]
+        digest = _digest(entry)
+        self._digests[id(entry)] = (entry, copy.deepcopy(entry), digest)
+        return digest
+
+    def _document_digest(self, doc):
+        # Top-level keys are few and rehashed every time; each entry of "item" keeps its digest
+        if not isinstance(doc, dict) or not isinstance(doc.get("item"), list):
+            return _digest(doc)
+        h = hashlib.sha1(_digest({k: v for k, v in doc.items() if k != "item"}))
+        h.update(len(doc["item"]).to_bytes(4, "little"))
+        for entry in doc["item"]:
+            h.update(self._entry_digest(entry))
+        return h.digest()
+
+    def _referenced_files(self, data_digest):
+        # Listed again only when the data, the index or the asset caches change
+        index = self.assets.index
+        key = (data_digest, index.root_path(), index.generation, self.assets.generation)
+        if self._asset_files[0] == key:
+            return self._asset_files[1]
+        files = {}
+        for name in referenced_asset_paths(self):
+            folder = index.resolve_dir(name)
+            if folder:
+                with os.scandir(folder) as entries:
+                    for e in entries:
+                        if e.is_file() and e.name.lower().endswith(".png"):
+                            files[f"{name}/{e.name}"] = e.path
+            else:
+                path = index.resolve_file(name)
+                if path:
+                    files[name] = path
+        listing = [(name.replace(os.sep, "/"), path) for name, path in sorted(files.items())]
+        self._asset_files = (key, listing)
+        return listing
+
+    def _assets_digest(self, data_digest):
+        # Every referenced file is stat'ed on each call; only files whose size or mtime
+        # moved are read again
+        h = hashlib.sha1()
+        for name, path in self._referenced_files(data_digest):
+            try:
+                st = os.stat(path)
+            except OSError:
+                h.update(name.encode("utf-8") + b"\0missing")
+                continue
+            cached = self._file_digests.get(path)
+            if cached is None or cached[:2] != (st.st_mtime_ns, st.st_size):
+                cached = self._file_digests[path] = (st.st_mtime_ns, st.st_size, file_digest(path))
+            h.update(name.encode("utf-8") + cached[2])
+        return h.digest()
+
+    def content_hash(self, assets=True):
+        """Canonical hash of this face in its current state: iwf.json, font.json and, with
+        assets, the content of every referenced asset file.
+
+        Independent of key order and formatting. Entries keep their digests between calls
+        and an entry is serialized again only when it no longer equals its copy from the
+        last hash, so an edit costs one entry's serialization. Asset files rewritten in
+        place are noticed by size or mtime; a glyph file added to a folder is noticed once
+        the asset index rescans.
+        """
+        if len(self._digests) > 2 * (len(self.data.get("item", [])) + len(self.font_data.get("item", []))) + 64:
+            self._digests.clear()  # drop digests of entries that are gone
+        data = self._document_digest(self.data)
+        h = hashlib.sha1(data + self._document_digest(self.font_data))
+        if assets:
+            h.update(self._assets_digest(data))
+        return h.hexdigest()
+
+def load_face(folder):
+    """WatchFaceModel for a face folder, with assets resolved inside that folder"""
+    model = WatchFaceModel()
+    model.assets = AssetManager(root=os.path.abspath(folder))
+    model.load_json(os.path.join(folder, "iwf.json"))
+    if os.path.exists(os.path.join(folder, "font.json")):
+        model.load_font_json(os.path.join(folder, "font.json"))
+    return model
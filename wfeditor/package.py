@@ -0,0 +1,146 @@
+"""Face package builds"""
+import os, sys, json, shutil, datetime
+
+from .startup import Image
+from .assets import AssetManager, HAND_KEYS, find_glyph_folder, pixel_digest
+from .footprint import format_bytes
+from .preview import PreviewExporter
+from .render import Renderer, QUALITY_FINAL
+
+DEDUP_MANIFEST = "dedup.json"  # duplicate glyph archive name -> archive name actually stored
+COPY_CHUNK = 1024 * 1024  # most bytes of any one asset held in memory while it is written
+PREVIEW_ASSET_BUDGET = 64 * 1024 * 1024  # decoded assets kept while rendering a headless preview
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None where the platform can't say"""
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def _image_digest(path):
+    # Decoded only for hashing and dropped again, so packaging never holds every glyph at once
+    with Image.open(path) as img:
+        rgba = img.convert("RGBA")
+    return pixel_digest(rgba), rgba.size
+
+class Packager:
+    """Builds a face package: iwf.json, font.json, a final-quality preview and every referenced asset"""
+
+    def __init__(self, model, renderer=None, exporter=None):
+        self.m = model
+        if renderer is None:
+            # A one-off preview render needn't keep every decoded asset alive
+            assets = AssetManager(model.assets.index.root, model.assets.disk_cache, PREVIEW_ASSET_BUDGET)
+            renderer = Renderer(model, assets=assets)
+        self.renderer = renderer
+        self.exporter = exporter or PreviewExporter()
+
+    def glyph_files(self):
+        """(archive name, source path) of every glyph PNG the face's custom widgets use"""
+        files = {}
+        index = self.m.assets.index
+        for it in self.m.data.get("item", []):
+            if it.get("widget") == "custom":
+                folder = find_glyph_folder(it.get("type", ""), it.get("font", ""), index)
+                if folder and os.path.isdir(folder):
+                    for entry in os.scandir(folder):
+                        if entry.is_file() and entry.name.lower().endswith(".png"):
+                            files[index.relpath(entry.path)] = entry.path
+        return sorted(files.items())
+
+    def glyph_duplicates(self):
+        """Duplicate glyph archive name -> archive name of its pixel-identical first copy"""
+        first, duplicates = {}, {}
+        for arcname, path in self.glyph_files():
+            try:
+                digest, _ = _image_digest(path)
+            except Exception:
+                continue  # unreadable PNGs are still packaged as-is
+            duplicates[arcname] = first.setdefault(digest, arcname)
+        return {dup: keep for dup, keep in duplicates.items() if dup != keep}
+
+    def sharing_report(self):
+        """Glyph copies shared across fonts and what that saves in decoded memory and package size"""
+        files = dict(self.glyph_files())
+        duplicates = self.glyph_duplicates()
+        groups = {}
+        for dup, keep in duplicates.items():
+            groups.setdefault(keep, [keep]).append(dup)
+        decoded = 0
+        for dup in duplicates:
+            _, (w, h) = _image_digest(files[dup])
+            decoded += w * h * 4
+        return {"groups": sorted(groups.values()), "duplicates": len(duplicates),
+                "memory_saved": decoded,
+                "package_saved": sum(os.path.getsize(files[dup]) for dup in duplicates)}
+
+    def asset_files(self):
+        """(archive name, source path) of every asset file the face references"""
+        files = dict(self.glyph_files())
+        d = self.m.data
+        index = self.m.assets.index
+        names = [d.get("bkground")]
+        for it in d.get("item", []):
+            if it.get("widget") == "watch" and it.get("type") == "time":
+                names.extend(it.get(key) for key in HAND_KEYS)
+        for name in names:
+            path = index.resolve_file(name) if name else None
+            if path:
+                # Stored under the name iwf.json uses for it
+                files[os.path.basename(name) if os.path.isabs(name) else name.replace(os.sep, "/")] = path
+        return sorted(files.items())
+
+    def build(self, out_path, when=None, dedup=False):
+        """Write the package; returns a report of archive entries and their sizes.
+
+        With dedup, pixel-identical glyphs are stored once and DEDUP_MANIFEST maps each
+        skipped archive name to the copy that was kept. The watch does not read that
+        manifest, so dedup is only for packages a DEDUP_MANIFEST-aware tool unpacks.
+
+        Every entry is streamed into the archive: assets are copied from their source file
+        COPY_CHUNK bytes at a time and the preview is encoded straight into its entry, so
+        memory use does not grow with the number or size of assets.
+        """
+        import zipfile
+        when = when or datetime.time(10, 8, 36)
+        img = self.renderer.render(when, multimeter_values={}, quality=QUALITY_FINAL)
+        preview = self.exporter.compose(img, self.renderer.profile.preview_size)
+        del img
+
+        duplicates = self.glyph_duplicates() if dedup else {}
+        report = {"entries": [], "deduplicated": len(duplicates), "dedup_saved": 0}
+        with zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("iwf.json", json.dumps(self.m.data, ensure_ascii=False, indent=4))
+            zf.writestr("font.json", json.dumps(self.m.font_data, ensure_ascii=False, separators=(',', ':')))
+            info = zipfile.ZipInfo(self.m.data.get("preview") or "preview.png",
+                                   datetime.datetime.now().timetuple()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with zf.open(info, "w") as dst:
+                preview.save(dst, "PNG")
+            del preview
+            for arcname, path in self.asset_files():
+                if arcname in duplicates:
+                    report["dedup_saved"] += os.path.getsize(path)
+                    continue
+                info = zipfile.ZipInfo.from_file(path, arcname)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with open(path, "rb") as src, zf.open(info, "w", force_zip64=info.file_size > 2**31) as dst:
+                    shutil.copyfileobj(src, dst, COPY_CHUNK)
+            if duplicates:
+                zf.writestr(DEDUP_MANIFEST, json.dumps(duplicates, indent=1, sort_keys=True))
+            for info in zf.infolist():
+                report["entries"].append((info.filename, info.compress_size))
+        report["total"] = os.path.getsize(out_path)
+        report["peak_rss"] = peak_rss()
+        return report
+
+def format_sharing_report(report):
+    lines = [f'{report["duplicates"]} duplicate glyphs in {len(report["groups"])} groups',
+             f'{format_bytes(report["memory_saved"])} decoded memory saved',
+             f'{format_bytes(report["package_saved"])} package size saved']
+    for group in report["groups"]:
+        lines.append(f'  {group[0]} = ' + ", ".join(group[1:]))
+    return "\n".join(lines)
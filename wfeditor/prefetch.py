@@ -0,0 +1,81 @@
+"""Speculative background rendering of the frames next to the one being previewed"""
+import datetime, threading, time
+
+from .render import Renderer, QUALITY_DRAFT
+
+def neighbor_times(when, seconds=10, minutes=5):
+    """Times near `when`, nearest first: +-1..seconds seconds, then +-1..minutes minutes"""
+    base = when.hour * 3600 + when.minute * 60 + when.second
+    offsets = []
+    for i in range(1, seconds + 1):
+        offsets += [i, -i]
+    for i in range(1, minutes + 1):
+        offsets += [60 * i, -60 * i]
+    return [_clock(base + off) for off in offsets]
+
+def _clock(total):
+    total %= 24 * 3600
+    return datetime.time(total // 3600, total // 60 % 60, total % 60)
+
+class FramePrefetcher:
+    """Fills a renderer's FrameCache with frames around the last requested time.
+
+    Works on its own Renderer (sharing the model, assets and frame cache) so the
+    foreground renderer's widget_values and layer caches are never touched from two
+    threads. It goes quiet once no request came in for idle_seconds, and drops its
+    work when the model hash moves under it.
+    """
+
+    def __init__(self, renderer, quality=QUALITY_DRAFT, seconds=10, minutes=5, idle_seconds=2.0):
+        self.renderer = renderer
+        self.quality = quality
+        self.seconds, self.minutes = seconds, minutes
+        self.idle_seconds = idle_seconds
+        self.rendered = 0  # frames rendered ahead of time, for diagnostics
+        self._worker = Renderer(renderer.m, renderer._profile, renderer.assets, renderer.frames)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._request = None  # (when, widget values, model hash, monotonic time)
+        self._thread = None
+
+    def request(self, when):
+        """Note that `when` is on screen; called from the UI thread after each render"""
+        fg = self.renderer
+        with self._lock:
+            self._request = (when, dict(fg.widget_values), fg.model_hash(), time.monotonic(),
+                             fg.premultiplied, fg.quantize_glyphs)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="FramePrefetcher", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                request = self._request
+            if request is None:
+                continue
+            when, values, model_hash, started, premultiplied, quantize = request
+            w = self._worker
+            w.widget_values = values
+            w.premultiplied, w.quantize_glyphs = premultiplied, quantize
+            for t in neighbor_times(when, self.seconds, self.minutes):
+                if (self._stop.is_set() or self._wake.is_set()
+                        or time.monotonic() - started > self.idle_seconds):
+                    break  # stopped, scrubbed elsewhere, or the user went idle
+                try:
+                    if w.model_hash() != model_hash:
+                        break  # edited since the request; frames would be stale
+                    if w.frame_key(t, self.quality) in w.frames:
+                        continue
+                    w.render(t, quality=self.quality)
+                    self.rendered += 1
+                except Exception:
+                    break  # the model changed mid-render; the next request starts over
@@ -0,0 +1,81 @@
+"""Store preview composition (scaled face + border)"""
+import os
+
+from .startup import Image
+from .profiles import IDW20_PROFILE
+
+# Watch face scale inside the preview frame
+PREVIEW_FACE_SCALE = 0.95
+
+class PreviewExporter:
+    """Composes store previews (scaled face + border) and caches the border per size"""
+
+    def __init__(self, border_file="border.png"):
+        self.border_file = border_file
+        self._borders = {}  # (path, mtime_ns, size) -> resized RGBA border
+
+    def _border(self, size):
+        try:
+            mtime = os.stat(self.border_file).st_mtime_ns
+        except OSError:
+            return None
+        key = (os.path.abspath(self.border_file), mtime, size)
+        border = self._borders.get(key)
+        if border is None:
+            try:
+                border = Image.open(self.border_file).convert("RGBA")
+            except Exception as e:
+                print(f"Error applying border: {e}")
+                return None
+            # Make sure border matches the target size (resize if needed)
+            if border.size != size:
+                border = border.resize(size, Image.Resampling.LANCZOS)
+            self._borders[key] = border
+        return border
+
+    def compose(self, img, size, border=True, transparent=False):
+        final_width, final_height = size
+        watchface_width = int(final_width * PREVIEW_FACE_SCALE)
+        watchface_height = int(final_height * PREVIEW_FACE_SCALE)
+        watchface_img = img.resize((watchface_width, watchface_height), Image.Resampling.LANCZOS)
+
+        # LAYERING ORDER:
+        # 1. Black (or transparent) background
+        # 2. Scaled watch face (centered)
+        # 3. Border on top (RGBA with transparency)
+        if transparent:
+            final_img = Image.new("RGBA", size, (0, 0, 0, 0))
+        else:
+            final_img = Image.new("RGB", size, (0, 0, 0))
+        x_offset = (final_width - watchface_width) // 2
+        y_offset = (final_height - watchface_height) // 2
+        final_img.paste(watchface_img, (x_offset, y_offset))
+
+        border_img = self._border(size) if border else None
+        if border_img is not None:
+            final_img = final_img.convert("RGBA")
+            final_img.alpha_composite(border_img, dest=(0, 0))
+        return final_img
+
+    def export(self, img, out_dir, basename="preview", sizes=None, borders=(True,), transparent=(False,)):
+        """Write every size x variant of an already rendered face in parallel; returns the paths"""
+        jobs = []
+        for size in sizes or IDW20_PROFILE.store_sizes:
+            for with_border in borders:
+                for clear in transparent:
+                    suffix = "" if with_border else "_noborder"
+                    suffix += "_transparent" if clear else ""
+                    name = f"{basename}_{size[0]}x{size[1]}{suffix}.png"
+                    jobs.append((os.path.join(out_dir, name), tuple(size), with_border, clear))
+        # Fill the border cache up front so workers never resize the same border twice
+        for size in {job[1] for job in jobs if job[2]}:
+            self._border(size)
+
+        def write(job):
+            path, size, with_border, clear = job
+            self.compose(img, size, border=with_border, transparent=clear).save(path)
+            return path
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor() as pool:
+            return list(pool.map(write, jobs))
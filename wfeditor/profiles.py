@@ -0,0 +1,78 @@
+"""Device profiles: screen geometry and defaults of each supported watch"""
+import json
+
+# Default widget layout for IDW20 (320x385)
+IDW20_DEFAULT_LAYOUT = {
+    "time": {"widget": "custom", "type": "time", "x": 24, "y": 261, "w": 173, "h": 51, "fgcolor": "0xFFFFFFFF", "fgrender": "0xFFFFFFFF", "align": "left", "font": "g13", "fontnum": 11},
+    "date": {"widget": "custom", "type": "date", "x": 79, "y": 333, "w": 84, "h": 24, "fgcolor": "0xFFFFFFFF", "fgrender": "0xFFFFFFFF", "align": "left", "style": 1, "font": "g14", "fontnum": 11},
+    "week": {"widget": "custom", "type": "week", "x": 181, "y": 333, "w": 59, "h": 24, "fgcolor": "0xFFFFFFFF", "fgrender": "0xFFFFFFFF", "align": "left", "style": 0, "font": "week", "fontnum": 7},
+    "day": {"widget": "custom", "type": "day", "x": 135, "y": 291, "w": 51, "h": 32, "fgcolor": "0xFFFFFFFF", "fgrender": "0xFFFFFFFF", "align": "left", "font": "g15", "fontnum": 10},
+    "second": {"widget": "custom", "type": "second", "x": 219, "y": 261, "w": 77, "h": 51, "fgcolor": "0xFFFFFFFF", "fgrender": "0xFFFFFFFF", "align": "left", "font": "g24", "fontnum": 10},
+    "hour": {"widget": "custom", "type": "hour", "x": 16, "y": 46, "w": 133, "h": 104, "fgcolor": "0xFFFFFFFF", "fgrender": "0xFFFFFFFF", "align": "left", "font": "g16", "fontnum": 10},
+    "min": {"widget": "custom", "type": "min", "x": 16, "y": 150, "w": 136, "h": 104, "fgcolor": "0xFFFFFFFF", "fgrender": "0xFFFFFFFF", "align": "left", "font": "g17", "fontnum": 10},
+    "year": {"widget": "custom", "type": "year", "x": 99, "y": 265, "w": 64, "h": 21, "fgcolor": "0xFFFFFFFF", "fgrender": "0xFFFFFFFF", "align": "left", "font": "g18", "fontnum": 11},
+    "heartrate": {"widget": "custom", "type": "heartrate", "x": 203, "y": 250, "w": 40, "h": 16, "fgcolor": "0xFFFFFFFF", "fgrender": "0xFFFFFFFF", "align": "left", "font": "g19", "fontnum": 11},
+    "calorie": {"widget": "custom", "type": "calorie", "x": 48, "y": 337, "w": 67, "h": 28, "fgcolor": "0xFFFFFFFF", "fgrender": "0xFFFFFFFF", "align": "left", "font": "g20", "fontnum": 10},
+    "distance": {"widget": "custom", "type": "distance", "x": 72, "y": 202, "w": 37, "h": 16, "fgcolor": "0xFFFFFFFF", "fgrender": "0xFFFFFFFF", "align": "left", "metricinch": 1, "font": "distance", "fontnum": 11},
+    "step": {"widget": "custom", "type": "step", "x": 48, "y": 269, "w": 80, "h": 28, "fgcolor": "0xFFFFFFFF", "fgrender": "0xFFFFFFFF", "align": "left", "font": "g21", "fontnum": 10},
+    "battery": {"widget": "custom", "type": "battery", "x": 203, "y": 292, "w": 59, "h": 16, "fgcolor": "0xFFFFFFFF", "fgrender": "0xFFFFFFFF", "align": "left", "font": "g22", "fontnum": 11},
+    "weather": {"widget": "custom", "type": "weather", "x": 200, "y": 85, "w": 64, "h": 16, "fgcolor": "0xFFFFFFFF", "fgrender": "0xFFFFFFFF", "align": "center", "style": 2, "font": "g23", "fontnum": 13},
+    "apm": {"widget": "custom", "type": "apm", "x": 101, "y": 296, "w": 37, "h": 16, "fgcolor": "0xFFFFFFFF", "fgrender": "0xFFFFFFFF", "align": "left", "font": "apm", "fontnum": 2},
+}
+
+def scaled_layout(layout, from_size, to_size):
+    """Copy of a widget layout with x/y/w/h scaled from one canvas size to another"""
+    sx, sy = to_size[0] / from_size[0], to_size[1] / from_size[1]
+    scaled = {}
+    for name, widget in layout.items():
+        widget = dict(widget)
+        for key, factor in (("x", sx), ("w", sx), ("y", sy), ("h", sy)):
+            if key in widget:
+                widget[key] = int(round(widget[key] * factor))
+        scaled[name] = widget
+    return scaled
+
+class DeviceProfile:
+    """Screen geometry and asset defaults of one target watch"""
+
+    def __init__(self, device_id, canvas_size, preview_size, bpp=16, hand_anchor=None,
+                 default_layout=None, store_sizes=None, flash_budget=None, ram_budget=None):
+        self.device_id = device_id
+        self.canvas_size = tuple(canvas_size)
+        self.preview_size = tuple(preview_size)
+        self.bpp = bpp
+        # Bytes available to one face on the watch; None = unknown
+        self.flash_budget = flash_budget
+        self.ram_budget = ram_budget
+        w, h = self.canvas_size
+        self.hand_anchor = tuple(hand_anchor) if hand_anchor else (w // 2, (h + 1) // 2)
+        if default_layout is None:
+            default_layout = scaled_layout(IDW20_DEFAULT_LAYOUT, (320, 385), self.canvas_size)
+        self.default_layout = default_layout
+        # Store preview sizes written by "Export Store Previews" (first one is preview.png)
+        pw, ph = self.preview_size
+        self.store_sizes = [tuple(s) for s in store_sizes] if store_sizes else [(pw, ph), (pw*2, ph*2), (pw//2, ph//2)]
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["deviceId"], d["canvas"], d["preview"], bpp=d.get("bpp", 16),
+                   hand_anchor=d.get("handAnchor"), default_layout=d.get("layout"),
+                   store_sizes=d.get("storeSizes"), flash_budget=d.get("flashBudget"),
+                   ram_budget=d.get("ramBudget"))
+
+IDW20_PROFILE = DeviceProfile("IDW20", (320, 385), (272, 324), bpp=16, hand_anchor=(160, 193),
+                              default_layout=IDW20_DEFAULT_LAYOUT)
+DEVICE_PROFILES = {"IDW20": IDW20_PROFILE}
+
+def get_device_profile(device_id):
+    """Profile for a deviceId, falling back to IDW20"""
+    return DEVICE_PROFILES.get(device_id, IDW20_PROFILE)
+
+def load_device_profiles(path):
+    """Register sibling devices from a JSON list of {"deviceId", "canvas", "preview", ...}"""
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    for entry in entries:
+        profile = DeviceProfile.from_dict(entry)
+        DEVICE_PROFILES[profile.device_id] = profile
+    return DEVICE_PROFILES
@@ -0,0 +1,128 @@
+"""Palette quantization and dithering of glyph sets for low-bpp fonts"""
+from .startup import Image
+
+DITHER_MODES = ("none", "ordered", "floyd-steinberg")
+
+_BAYER4 = [[0, 8, 2, 10], [12, 4, 14, 6], [3, 11, 1, 9], [15, 7, 13, 5]]
+
+def _premultiply(rgba):
+    import numpy as np
+    px = rgba.astype(np.float32)
+    px[..., :3] *= px[..., 3:4] / 255.0
+    return px
+
+def _unpremultiply(px):
+    import numpy as np
+    out = px.copy()
+    a = out[..., 3:4]
+    out[..., :3] = np.where(a > 0, out[..., :3] * 255.0 / np.maximum(a, 1e-6), 0)
+    return np.clip(np.rint(out), 0, 255).astype(np.uint8)
+
+def median_cut(pixels, colors):
+    """Palette of at most `colors` premultiplied RGBA entries for an (N, 4) float array"""
+    import numpy as np
+    unique, counts = np.unique(pixels, axis=0, return_counts=True)
+    span = lambda b: np.ptp(unique[b], axis=0) if len(b) > 1 else np.zeros(4, np.float32)
+    boxes = [np.arange(len(unique))]
+    spans = [span(boxes[0])]
+    while len(boxes) < colors:
+        # Split the box whose widest channel spans the most, at its weighted median
+        i = max(range(len(boxes)), key=lambda j: spans[j].max())
+        if spans[i].max() == 0:
+            break  # every box is a single color
+        box, channel = boxes[i], int(spans[i].argmax())
+        box = box[np.argsort(unique[box, channel], kind="stable")]
+        cum = np.cumsum(counts[box])
+        cut = min(max(1, int(np.searchsorted(cum, cum[-1] / 2.0))), len(box) - 1)
+        boxes[i:i + 1] = [box[:cut], box[cut:]]
+        spans[i:i + 1] = [span(box[:cut]), span(box[cut:])]
+    return np.array([np.average(unique[b], axis=0, weights=counts[b]) for b in boxes], dtype=np.float32)
+
+def _nearest(px, palette):
+    # (..., 4) -> palette indices, in chunks so huge sets don't allocate N x K x 4 at once
+    import numpy as np
+    flat = px.reshape(-1, 4)
+    out = np.empty(len(flat), dtype=np.uint8)
+    # |p - c|^2 = |p|^2 - 2 p.c + |c|^2; |p|^2 doesn't change the argmin, the rest is one matmul
+    norms = (palette ** 2).sum(axis=1)
+    for start in range(0, len(flat), 65536):
+        chunk = flat[start:start + 65536]
+        out[start:start + 65536] = (norms[None, :] - 2.0 * chunk @ palette.T).argmin(axis=1)
+    return out.reshape(px.shape[:-1])
+
+def _floyd_steinberg(px, opaque, palette):
+    # Pixel (x, y) only takes error from pixels with a smaller x + 2y, so every pixel on
+    # one line x + 2y = t (of every glyph) is quantized in a single step. Errors land in
+    # the same order as a row-by-row scan, so the result is identical to one.
+    import numpy as np
+    _, H, W, _ = px.shape
+    index = np.zeros(px.shape[:3], np.uint8)
+    work = px.copy()
+    norms = (palette ** 2).sum(axis=1)
+    for t in range(W + 2 * (H - 1)):
+        ys = np.arange(max(0, -(-(t - W + 1) // 2)), min(H - 1, t // 2) + 1)
+        xs = t - 2 * ys
+        old = work[:, ys, xs]
+        idx = (norms - 2.0 * old @ palette.T).argmin(axis=2)  # as in _nearest
+        index[:, ys, xs] = idx
+        err = (old - palette[idx]) * opaque[:, ys, xs, None]
+        down = ys + 1 < H
+        # A pixel's down-left share arrives before its left neighbour's right share, as in a scan
+        m = down & (xs > 0)
+        work[:, ys[m] + 1, xs[m] - 1] += err[:, m] * (3 / 16)
+        work[:, ys[down] + 1, xs[down]] += err[:, down] * (5 / 16)
+        m = down & (xs + 1 < W)
+        work[:, ys[m] + 1, xs[m] + 1] += err[:, m] * (1 / 16)
+        m = xs + 1 < W
+        work[:, ys[m], xs[m] + 1] += err[:, m] * (7 / 16)
+    return index
+
+def quantize_images(images, bpp, dither="none"):
+    """Quantize RGBA images to one shared 2**bpp color palette.
+
+    The set is stacked into one array so the palette, the nearest-color search and the
+    dithering each run once for every glyph together. Fully transparent pixels always map
+    to a reserved transparent entry, so glyph shapes and bounding boxes never grow.
+    Returns (palette as straight RGBA uint8 rows, list of quantized RGBA images).
+    """
+    import numpy as np
+    if dither not in DITHER_MODES:
+        raise ValueError(f"unknown dither mode {dither}")
+    if not images:
+        return np.zeros((0, 4), np.uint8), []
+    H = max(img.size[1] for img in images)
+    W = max(img.size[0] for img in images)
+    stack = np.zeros((len(images), H, W, 4), dtype=np.uint8)
+    for i, img in enumerate(images):
+        stack[i, :img.size[1], :img.size[0]] = np.asarray(img.convert("RGBA"))
+    px = _premultiply(stack)
+    opaque = stack[..., 3] > 0
+
+    colors = 2 ** bpp
+    palette = np.zeros((1, 4), np.float32)  # entry 0: transparent
+    if opaque.any():
+        palette = np.concatenate([palette, median_cut(px[opaque], max(1, colors - 1))])
+
+    if dither == "ordered":
+        # Offset each pixel by a Bayer threshold scaled to the typical palette spacing
+        bayer = (np.array(_BAYER4, np.float32) + 0.5) / 16.0 - 0.5
+        spread = 255.0 / max(1, len(palette) - 1)
+        tile = np.tile(bayer, (H // 4 + 1, W // 4 + 1))[:H, :W]
+        index = _nearest(np.clip(px + tile[None, :, :, None] * spread, 0, 255), palette)
+    elif dither == "floyd-steinberg":
+        index = _floyd_steinberg(px, opaque, palette)
+    else:
+        index = _nearest(px, palette)
+    index[~opaque] = 0
+
+    straight = _unpremultiply(palette)
+    out = straight[index]
+    result = [Image.fromarray(out[i, :img.size[1], :img.size[0]], "RGBA") for i, img in enumerate(images)]
+    return straight, result
+
+def quantization_error(original, quantized):
+    """Mean absolute per-channel difference between two RGBA images"""
+    import numpy as np
+    a = np.asarray(original.convert("RGBA"), dtype=np.int16)
+    b = np.asarray(quantized.convert("RGBA"), dtype=np.int16)
+    return float(np.abs(a - b).mean())
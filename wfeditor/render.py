@@ -0,0 +1,398 @@
+"""Rendering a face to a PIL image"""
+import datetime, threading
+from collections import OrderedDict
+
+from .startup import Image
+from .assets import AssetManager, GLYPH_SPECIAL_CHARS, find_glyph_folder, premultiplied_pair
+from .model import WatchFaceModel
+from .profiles import get_device_profile
+
+# Render quality presets: draft for interactive editing, final for exports and packages
+QUALITY_DRAFT, QUALITY_FINAL = "draft", "final"
+RENDER_QUALITY = {
+    QUALITY_DRAFT: {"resize": "BILINEAR", "rotate": "NEAREST"},
+    QUALITY_FINAL: {"resize": "BICUBIC", "rotate": "BICUBIC"},
+}
+
+FRAME_CACHE_SIZE = 32  # finished frames kept per renderer (~0.8 MB each at 454x454)
+
+class FrameCache:
+    """Thread-safe LRU of finished frames; renderers of one model may share one"""
+
+    def __init__(self, size=FRAME_CACHE_SIZE):
+        self.size = size
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+            return frame
+
+    def put(self, key, frame):
+        with self._lock:
+            self._frames[key] = frame
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.size:
+                self._frames.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._frames
+
+    def __len__(self):
+        return len(self._frames)
+
+class Renderer:
+    def __init__(self, model: WatchFaceModel, profile=None, assets=None, frames=None):
+        self.m = model
+        self._profile = profile  # None follows model.data["deviceId"]
+        self.assets = assets or model.assets
+        self.layers = {}  # (asset key, size, resample) -> asset scaled for this renderer's canvas
+        self._layers_generation = self.assets.generation
+        self._glyph_sets = {}  # glyph folder -> (validity key, glyph entries)
+        self.quantize_glyphs = None  # a quantize.DITHER_MODES entry previews fonts at their font.json bpp
+        self.premultiplied = False  # composite on a premultiplied canvas; straight alpha only at output
+        self.trim_hands = True  # False draws hands from the full PNG (reference for golden --check-trim)
+        self.frames = frames if frames is not None else FrameCache()  # render() memo
+        self.widget_values = {
+            "time": "10:08",
+            "date": "09/21",
+            "week": "TUE",
+            "day": "21",
+            "second": "36",
+            "hour": "10",
+            "min": "08",
+            "year": "2023",
+            "heartrate": "128",
+            "calorie": "327",
+            "distance": "10.22",
+            "step": "16772",
+            "battery": "85%",
+            "weather": "25oC",
+            "apm": "PM"
+        }
+
+    @property
+    def profile(self):
+        return self._profile or get_device_profile(self.m.data.get("deviceId"))
+
+    def _scaled_layer(self, key, size, resample):
+        # Dropped wholesale whenever the asset cache invalidates something
+        if self._layers_generation != self.assets.generation:
+            self.layers.clear()
+            self._layers_generation = self.assets.generation
+        layer = self.layers.get((key, size, resample))
+        if layer is None:
+            layer = self.assets.load_image(key)
+            if layer.size != size:
+                layer = layer.resize(size, resample)
+            self.layers[(key, size, resample)] = layer
+        return layer
+
+    def _premultiplied_layer(self, key, size, resample):
+        pair = self.layers.get((key, size, resample, "premultiplied"))
+        if pair is None:
+            pair = premultiplied_pair(self._scaled_layer(key, size, resample))
+            self.layers[(key, size, resample, "premultiplied")] = pair
+        return pair
+
+    def update_widget_value(self, widget_type, value):
+        """Update a specific widget's preview value"""
+        if widget_type in self.widget_values:
+            self.widget_values[widget_type] = str(value)
+            return True
+        return False
+
+    def _hand(self, name, item, prefix):
+        # (image or None, pivot x, y within it) of one hand
+        iw, ih = self.assets.load_image(name).size
+        cx, cy = int(item.get(f"{prefix}centerx", iw//2)), int(item.get(f"{prefix}centery", ih//2))
+        if not self.trim_hands:
+            return self.assets.load_image(name), cx, cy
+        img, (ox, oy), _ = self.assets.load_hand(name, (cx, cy))
+        return img, cx - ox, cy - oy
+
+    def _paste_centered(self, base, img, anchorx, anchory, centerx, centery, angle=0, resample=None):
+        # Rotate around the image's local center (centerx,centery) then paste so that
+        # the anchor on the canvas aligns with that pivot.
+        # Create a canvas big enough to hold rotation without cropping
+        ox, oy = int(centerx), int(centery)
+        # Create offset so pivot is at the center for rotation
+        # Place original image onto a larger canvas so that (ox,oy) becomes the center
+        w, h = img.size
+        pad_left = max(ox, w-ox)
+        pad_top  = max(oy, h-oy)
+        big_w, big_h = pad_left + pad_left, pad_top + pad_top
+        big = Image.new("RGBA", (big_w, big_h), (0,0,0,0))
+        paste_x = pad_left - ox
+        paste_y = pad_top - oy
+        big.paste(img, (paste_x, paste_y), img)
+        rot = big.rotate(-angle, resample=Image.BICUBIC if resample is None else resample, expand=True)
+        # Now paste so that the center of rot equals (anchorx,anchory)
+        rx, ry = rot.size
+        pos = (int(anchorx - rx/2), int(anchory - ry/2))
+        if base.mode == "RGBa":
+            # premultiplied_pair without the copy; rot is ours to modify
+            mask = rot.getchannel("A")
+            rot.putalpha(255)
+            base.paste(rot.convert("RGBa"), pos, mask)
+        else:
+            base.alpha_composite(rot, dest=pos)
+
+    def sibling(self):
+        """A Renderer sharing this one's model, assets and frame cache, with a copy of its settings"""
+        other = Renderer(self.m, self._profile, self.assets, self.frames)
+        other.widget_values = dict(self.widget_values)
+        other.quantize_glyphs, other.premultiplied = self.quantize_glyphs, self.premultiplied
+        other.trim_hands = self.trim_hands
+        return other
+
+    def adopt_glyph_sets(self, other):
+        """Reuse the glyph sets another renderer of the same model loaded; their keys still decide validity"""
+        self._glyph_sets.update(other._glyph_sets)
+
+    def _load_glyphs(self, digits_path, bpp=None):
+        """Load the digit and special character PNGs of a glyph folder (as load_trimmed entries)"""
+        # Reused until the index rescans or any asset is invalidated
+        quantize = self.quantize_glyphs if bpp and bpp <= 8 else None
+        key = (digits_path, self.assets.index.generation, self.assets.generation, quantize, bpp,
+               self.premultiplied)
+        cached = self._glyph_sets.get(digits_path)
+        if cached and cached[0] == key:
+            return cached[1]
+        digit_images = {}
+        names = [(digit, digit) for digit in "0123456789"] + list(GLYPH_SPECIAL_CHARS.items())
+        for char_name, char_value in names:
+            # The index matches file names case-insensitively (0.png, colon.PNG, COLON.png, ...)
+            char_file = self.assets.index.resolve_in(digits_path, f"{char_name}.png")
+            if char_file:
+                try:
+                    if self.premultiplied and not quantize:
+                        digit_images[char_value] = self.assets.load_premultiplied(char_file)
+                    else:
+                        digit_images[char_value] = self.assets.load_trimmed(char_file)
+                except:
+                    pass
+        if quantize:
+            # The whole set shares one palette, as it would on the device
+            from .quantize import quantize_images
+            chars = [c for c, entry in digit_images.items() if entry[0] is not None]
+            _, quantized = quantize_images([digit_images[c][0] for c in chars], bpp, quantize)
+            for c, img in zip(chars, quantized):
+                digit_images[c] = (img,) + digit_images[c][1:]
+            if self.premultiplied:
+                for c, (img, offset, size) in digit_images.items():
+                    digit_images[c] = (premultiplied_pair(img) if img is not None else None, offset, size)
+        self._glyph_sets[digits_path] = (key, digit_images)
+        return digit_images
+
+    def _render_digit_widget(self, canvas, item, value):
+        """Render a widget using individual digit PNGs"""
+        try:
+            widget_type = item.get("type")
+            x, y = item.get("x", 0), item.get("y", 0)
+            w, h = item.get("w", 0), item.get("h", 0)
+            align = item.get("align", "left")
+            
+            # Get the value to display
+            if widget_type in self.widget_values:
+                value_str = str(self.widget_values[widget_type])
+            else:
+                value_str = "0"
+            
+            # Get font information
+            font_name = item.get("font", "")
+            
+            # Load digit images
+            digits_path = find_glyph_folder(widget_type, font_name, self.assets.index)
+            
+            if digits_path:
+                digit_images = self._load_glyphs(digits_path, self.m.font_bpp(font_name))
+            
+                # Calculate total width
+                total_width = 0
+                char_widths = []
+                for char in value_str:
+                    if char in digit_images:
+                        full_width = digit_images[char][2][0]
+                        total_width += full_width
+                        char_widths.append(full_width)
+                    else:
+                        # Default width for missing characters
+                        total_width += 10
+                        char_widths.append(10)
+                
+                # Calculate starting position based on alignment
+                current_x = x
+                if align == "center":
+                    current_x = x + (w - total_width) // 2
+                elif align == "right":
+                    current_x = x + w - total_width
+                
+                # Render each character
+                for char in value_str:
+                    if char in digit_images:
+                        # Trimmed glyph drawn at its offset; advance by the untrimmed width
+                        img, (ox, oy), (full_width, _) = digit_images[char]
+                        if img is None:
+                            pass
+                        elif self.premultiplied:
+                            canvas.paste(img[0], (current_x + ox, y + oy), img[1])
+                        else:
+                            canvas.alpha_composite(img, (current_x + ox, y + oy))
+                        current_x += full_width
+                    else:
+                        # If no image for this character, skip it
+                        current_x += 10  # Default width for missing characters
+            
+        except Exception as e:
+            print(f"Error rendering {widget_type} widget: {e}")
+
+    def model_hash(self):
+        """Canonical hash of everything in the model a frame depends on"""
+        # Asset content is covered by the generations in frame_key
+        return self.m.content_hash(assets=False)
+
+    def frame_key(self, when, quality=QUALITY_FINAL):
+        """Memo key of the frame render(when, quality=quality) would produce; updates the time widget values"""
+        # Update time widgets based on custom time
+        if when:
+            # Update time components
+            hour_str = str(when.hour).zfill(2)
+            min_str = str(when.minute).zfill(2)
+            sec_str = str(when.second).zfill(2)
+            
+            # Format time as HH:MM
+            time_str = f"{hour_str}:{min_str}"
+            
+            # Update widget values
+            self.widget_values["time"] = time_str
+            self.widget_values["hour"] = hour_str
+            self.widget_values["min"] = min_str
+            self.widget_values["second"] = sec_str
+            self.widget_values["apm"] = "PM" if when.hour >= 12 else "AM"
+
+        # Any change to the model, values or assets gives a new key
+        return (self.model_hash(), tuple(sorted(self.widget_values.items())), when, quality,
+                self.premultiplied, self.quantize_glyphs, self.trim_hands, self.profile.device_id,
+                self.profile.canvas_size,
+                self.assets.generation, self.assets.index.generation)
+
+    def render(self, when: datetime.time, multimeter_values=None, quality=QUALITY_FINAL):
+        self.assets.index.refresh_if_stale()
+        key = self.frame_key(when, quality)
+        frame = self.frames.get(key)
+        if frame is None:
+            frame = self._draw(when, quality)
+            self.frames.put(key, frame)
+        return frame.copy()
+
+    def _draw(self, when, quality):
+        preset = RENDER_QUALITY[quality]
+        resize_filter = getattr(Image.Resampling, preset["resize"])
+        rotate_filter = getattr(Image.Resampling, preset["rotate"])
+        W, H = self.profile.canvas_size
+        canvas = Image.new("RGBa" if self.premultiplied else "RGBA", (W, H), (0,0,0,0))
+        d = self.m.data
+        # background
+        if d.get("bkground"):
+            try:
+                if self.premultiplied:
+                    color, mask = self._premultiplied_layer(d["bkground"], (W, H), resize_filter)
+                    canvas.paste(color, (0, 0), mask)
+                else:
+                    bg = self._scaled_layer(d["bkground"], (W, H), resize_filter)
+                    canvas.alpha_composite(bg)
+            except Exception as e:
+                pass
+
+        # widgets/items
+        for it in d.get("item", []):
+            wtype = (it.get("widget"), it.get("type"))
+            
+            # Handle digit-based widgets
+            if it.get("widget") == "custom" and it.get("type") in ["time", "date", "week", "day", "second", 
+                                                                  "hour", "min", "year", "heartrate", 
+                                                                  "calorie", "distance", "step", "battery", 
+                                                                  "weather", "apm"]:
+                self._render_digit_widget(canvas, it, self.widget_values.get(it.get("type"), ""))
+            
+            # Handle watch hands
+            elif wtype == ("watch","time"):
+                hour_img = it.get("hour")
+                min_img  = it.get("minute")
+                sec_img  = it.get("second")
+                # hour
+                if hour_img:
+                    img, cx, cy = self._hand(hour_img, it, "hour")
+                    ax, ay = it.get("houranchorx", W//2), it.get("houranchory", H//2)
+                    angle = (when.hour%12 + when.minute/60.0) * 30.0
+                    if img is not None:
+                        self._paste_centered(canvas, img, ax, ay, cx, cy, angle, rotate_filter)
+                # minute
+                if min_img:
+                    img, cx, cy = self._hand(min_img, it, "min")
+                    ax, ay = it.get("minanchorx", W//2), it.get("minanchory", H//2)
+                    angle = (when.minute + when.second/60.0) * 6.0
+                    if img is not None:
+                        self._paste_centered(canvas, img, ax, ay, cx, cy, angle, rotate_filter)
+                # second
+                if sec_img:
+                    img, cx, cy = self._hand(sec_img, it, "sec")
+                    ax, ay = it.get("secanchorx", W//2), it.get("secanchory", H//2)
+                    angle = (when.second) * 6.0
+                    if img is not None:
+                        self._paste_centered(canvas, img, ax, ay, cx, cy, angle, rotate_filter)
+
+        if self.premultiplied:
+            return canvas.convert("RGBA")
+        return canvas
+
+def benchmark_compositing(model, frames=50, when=None):
+    """Milliseconds per frame with straight and premultiplied compositing, plus their largest
+    per-channel pixel difference (premultiplied rounding only shows on translucent pixels)"""
+    import time
+    from PIL import ImageChops
+    when = when or datetime.time(10, 8, 36)
+    # Step through seconds so digit widgets change glyphs from frame to frame
+    times = [(datetime.datetime.combine(datetime.date.today(), when) + datetime.timedelta(seconds=i)).time()
+             for i in range(frames)]
+    report = {"frames": frames}
+    outputs = {}
+    for mode in ("straight", "premultiplied"):
+        # No frame memo: the timed loop composites every frame, including the warm-up time
+        renderer = Renderer(model, frames=FrameCache(0))
+        renderer.premultiplied = mode == "premultiplied"
+        outputs[mode] = renderer.render(when)  # warm the asset and layer caches
+        start = time.perf_counter()
+        for t in times:
+            renderer.render(t)
+        report[mode] = (time.perf_counter() - start) * 1000.0 / frames
+    diff = ImageChops.difference(outputs["straight"], outputs["premultiplied"])
+    report["max_diff"] = max(hi for _, hi in diff.getextrema())
+    return report
+
+class MultiProfileRenderer:
+    """Renders one face for several device profiles in parallel, each with its own caches"""
+
+    def __init__(self, model, profiles):
+        self.m = model
+        # Separate AssetManager per profile so no two workers share a cache; same root as the model's
+        assets = model.assets
+        self.renderers = {p.device_id: Renderer(model, profile=p,
+                                                assets=AssetManager(assets.index.root, assets.disk_cache))
+                          for p in profiles}
+
+    def render(self, when, widget_values=None):
+        def work(renderer):
+            if widget_values:
+                renderer.widget_values.update({k: str(v) for k, v in widget_values.items()})
+            return renderer.render(when)
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(self.renderers) or 1) as pool:
+            images = pool.map(work, self.renderers.values())
+            return dict(zip(self.renderers.keys(), images))
@@ -0,0 +1,210 @@
+"""Local HTTP render service: python -m wfeditor serve FACES_DIR
+
+GET /faces                       -> JSON list of faces with their current hash
+GET /render?face=NAME&time=10:08:36&quality=final&heartrate=92&...
+                                 -> PNG; any Renderer.widget_values key may be overridden,
+                                    time defaults to 10:08:36
+"""
+import os, io, json, datetime, threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl
+
+from .assets import AssetManager, AssetWatcher
+from .model import WatchFaceModel
+from .render import Renderer, FrameCache, RENDER_QUALITY, QUALITY_FINAL
+
+class ServedFace:
+    """One face folder kept warm: model, decoded assets and one Renderer per worker thread"""
+
+    def __init__(self, folder, watch_interval=1.0):
+        self.folder = os.path.abspath(folder)
+        self.name = os.path.basename(self.folder)
+        self.model = WatchFaceModel()
+        self.model.assets = AssetManager(root=self.folder)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._mtime = None
+        self.hash = None
+        self.watcher = None
+        self.reload_if_changed()
+        self.watcher = AssetWatcher(self.model, interval=watch_interval)
+        self.watcher.start()
+
+    def reload_if_changed(self):
+        """Re-read iwf.json when it changed on disk and pick up edited assets"""
+        path = os.path.join(self.folder, "iwf.json")
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            if mtime != self._mtime:
+                with open(path, "rb") as f:
+                    self.model.data = json.load(f)
+                self._mtime = mtime
+            if self.watcher is not None:
+                changed = self.watcher.drain()
+                if changed:
+                    self.model.assets.invalidate(changed)
+            # Canonical, so re-saving iwf.json with other formatting keeps cached responses
+            self.hash = self.model.content_hash()
+
+    def current_hash(self):
+        # iwf.json and the hash are swapped together under the lock
+        with self._lock:
+            return self.hash
+
+    def renderer(self):
+        # Renderer.render mutates widget_values, so each worker thread gets its own
+        r = getattr(self._local, "renderer", None)
+        if r is None:
+            # No frame memo: the ResponseCache already keeps every rendered frame, encoded
+            r = self._local.renderer = Renderer(self.model, frames=FrameCache(0))
+            self._local.defaults = dict(r.widget_values)
+        r.widget_values = dict(self._local.defaults)
+        return r
+
+    def close(self):
+        self.watcher.stop()
+
+class ResponseCache:
+    """Thread-safe LRU of encoded responses"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._items.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+def parse_time(text):
+    """H, H:M or H:M:S; anything else raises ValueError, which the handler answers with 400"""
+    parts = text.split(":")
+    if not 1 <= len(parts) <= 3:
+        raise ValueError(f"invalid time {text!r}, expected H:M:S")
+    return datetime.time(*[int(p) for p in parts])
+
+class RenderService:
+    """Faces, response cache and the worker pool behind the HTTP handler"""
+
+    def __init__(self, faces_dir, workers=None, cache_size=256, watch_interval=1.0):
+        self.faces = {}
+        for entry in sorted(os.scandir(faces_dir), key=lambda e: e.name):
+            if entry.is_dir() and os.path.isfile(os.path.join(entry.path, "iwf.json")):
+                self.faces[entry.name] = ServedFace(entry.path, watch_interval)
+        self.cache = ResponseCache(cache_size)
+        self.pool = ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1),
+                                       thread_name_prefix="render")
+        self._pending = {}  # cache key -> Future, so identical concurrent requests render once
+        self._pending_lock = threading.Lock()
+
+    def face_list(self):
+        for face in self.faces.values():
+            face.reload_if_changed()
+        return [{"name": f.name, "hash": f.hash, "deviceId": f.model.data.get("deviceId")}
+                for f in self.faces.values()]
+
+    def render_png(self, face_name, when, widget_values, quality):
+        """PNG bytes for one request, from the cache when the face and parameters are unchanged"""
+        face = self.faces[face_name]
+        face.reload_if_changed()
+        # The hash covers asset contents too, so identical face folders share responses
+        key = (face.hash, when, quality, tuple(sorted(widget_values.items())))
+        png = self.cache.get(key)
+        if png is not None:
+            return png
+        with self._pending_lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = self.pool.submit(
+                    self._render, face, when, widget_values, quality)
+        try:
+            png = future.result()
+        finally:
+            with self._pending_lock:
+                self._pending.pop(key, None)
+        # A reload on another thread during the render may have mixed in the new iwf.json
+        if face.current_hash() == key[0]:
+            self.cache.put(key, png)
+        return png
+
+    def _render(self, face, when, widget_values, quality):
+        r = face.renderer()
+        r.widget_values.update(widget_values)
+        img = r.render(when, quality=quality)
+        buf = io.BytesIO()
+        img.save(buf, "PNG")
+        return buf.getvalue()
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+        for face in self.faces.values():
+            face.close()
+
+class RenderHandler(BaseHTTPRequestHandler):
+    service = None  # set by serve()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        try:
+            if url.path == "/faces":
+                body = json.dumps(self.service.face_list()).encode("utf-8")
+                return self._send(200, "application/json", body)
+            if url.path == "/render":
+                face = params.pop("face", None) or next(iter(self.service.faces), None)
+                if face not in self.service.faces:
+                    return self._send(404, "text/plain", f"unknown face {face}".encode())
+                when = parse_time(params.pop("time", "10:08:36"))  # the editor's preview time
+                quality = params.pop("quality", QUALITY_FINAL)
+                if quality not in RENDER_QUALITY:
+                    return self._send(400, "text/plain", f"unknown quality {quality}".encode())
+                png = self.service.render_png(face, when, params, quality)
+                return self._send(200, "image/png", png)
+            self._send(404, "text/plain", b"not found")
+        except ValueError as e:
+            self._send(400, "text/plain", str(e).encode())
+        except Exception as e:
+            self._send(500, "text/plain", f"{type(e).__name__}: {e}".encode())
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass  # keep the console quiet; the dashboard polls often
+
+class RenderHTTPServer(ThreadingHTTPServer):
+    request_queue_size = 64  # dashboards fire bursts of requests
+
+def serve(faces_dir, host="127.0.0.1", port=8765, workers=None, cache_size=256):
+    service = RenderService(faces_dir, workers, cache_size)
+    handler = type("Handler", (RenderHandler,), {"service": service})
+    httpd = RenderHTTPServer((host, port), handler)
+    print(f"Serving {len(service.faces)} faces on http://{host}:{port}/ (Ctrl+C to stop)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        service.close()
+        print(f"Cache: {service.cache.hits} hits, {service.cache.misses} misses")
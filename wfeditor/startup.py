@@ -0,0 +1,33 @@
+"""Startup timing and deferred imports, so importing the library stays cheap"""
+import time
+STARTUP_T0 = time.perf_counter()
+import importlib
+
+# (label, seconds since STARTUP_T0, duration or None) milestones for --startup-report
+STARTUP_MARKS = []
+
+def mark_startup(label, duration=None):
+    STARTUP_MARKS.append((label, time.perf_counter() - STARTUP_T0, duration))
+
+def format_startup_report():
+    lines = ["Startup timing:"]
+    for label, at, duration in STARTUP_MARKS:
+        took = f" (took {duration * 1000:.1f} ms)" if duration is not None else ""
+        lines.append(f"  {at * 1000:8.1f} ms  {label}{took}")
+    return "\n".join(lines)
+
+class LazyModule:
+    """Imports a module on first attribute access, keeping it off the startup path"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            t0 = time.perf_counter()
+            self._module = importlib.import_module(self._name)
+            mark_startup(f"import {self._name}", time.perf_counter() - t0)
+        return getattr(self._module, attr)
+
+Image = LazyModule("PIL.Image")
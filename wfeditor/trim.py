@@ -0,0 +1,83 @@
+"""Cropping sprites to their alpha bounding box"""
+import os, io
+
+from .startup import Image
+from .assets import HAND_KEYS, find_glyph_folder, pivot_safe_box
+from .footprint import format_bytes
+
+def _png_size(img):
+    buf = io.BytesIO()
+    img.save(buf, "PNG", optimize=True)
+    return buf.tell()
+
+def trim_face_assets(model, apply=False):
+    """Measure (and for hands, apply) cropping of hand and glyph PNGs to their alpha bounding box.
+
+    Hand files are cropped with pivot_safe_box and rewritten with their pivot moved by
+    the crop offset, so renders stay pixel-identical. Glyph files stay untouched on disk
+    because the font format takes the advance from the image width; the renderer
+    composites their trimmed copies instead. Byte savings compare the trimmed and
+    untrimmed image encoded the same way, so recompression is not counted.
+    """
+    report = {"assets": [], "pixels_saved": 0, "bytes_saved": 0}
+    seen = set()
+
+    def measure(kind, path, pivot=None):
+        img = Image.open(path).convert("RGBA")
+        box = img.getchannel("A").getbbox() or (0, 0, 0, 0)
+        if pivot is not None and box[2] > box[0]:
+            box = pivot_safe_box(box, img.size, pivot(img.size))
+        entry = {"kind": kind, "path": path, "size": img.size, "box": box,
+                 "pixels_saved": img.size[0] * img.size[1] - (box[2] - box[0]) * (box[3] - box[1]),
+                 "bytes_saved": 0, "applied": False}
+        report["assets"].append(entry)
+        report["pixels_saved"] += entry["pixels_saved"]
+        return img, entry
+
+    for it in model.data.get("item", []):
+        if it.get("widget") == "watch" and it.get("type") == "time":
+            for key, prefix in HAND_KEYS.items():
+                path = it.get(key)
+                if not path or path in seen or not os.path.exists(path):
+                    continue
+                seen.add(path)
+                # The renderer rotates about the integer pivot
+                pivot = lambda size: (int(it.get(f"{prefix}centerx", size[0]//2)),
+                                      int(it.get(f"{prefix}centery", size[1]//2)))
+                img, entry = measure("hand", path, pivot)
+                box = entry["box"]
+                if not entry["pixels_saved"] or box[2] == box[0]:
+                    continue
+                cropped = img.crop(box)
+                entry["bytes_saved"] = _png_size(img) - _png_size(cropped)
+                report["bytes_saved"] += max(0, entry["bytes_saved"])
+                if apply:
+                    cx, cy = pivot(img.size)
+                    cropped.save(path)
+                    it[f"{prefix}centerx"] = cx - box[0]
+                    it[f"{prefix}centery"] = cy - box[1]
+                    model.changed(it)
+                    model.assets.invalidate([path])
+                    entry["applied"] = True
+        elif it.get("widget") == "custom":
+            folder = find_glyph_folder(it.get("type", ""), it.get("font", ""), model.assets.index)
+            if not folder or folder in seen or not os.path.isdir(folder):
+                continue
+            seen.add(folder)
+            for entry in os.scandir(folder):
+                if entry.is_file() and entry.name.lower().endswith(".png"):
+                    measure("glyph", entry.path)
+    return report
+
+def format_trim_report(report):
+    hands = [a for a in report["assets"] if a["kind"] == "hand"]
+    glyphs = [a for a in report["assets"] if a["kind"] == "glyph"]
+    lines = [f'{len(hands)} hands, {len(glyphs)} glyphs checked',
+             f'{report["pixels_saved"]} transparent pixels no longer composited per frame',
+             f'{format_bytes(report["bytes_saved"])} smaller hand PNGs']
+    for a in hands:
+        if a["pixels_saved"]:
+            state = "trimmed" if a["applied"] else "trimmable"
+            lines.append(f'  {a["path"]}: {a["size"][0]}x{a["size"][1]} -> '
+                         f'{a["box"][2]-a["box"][0]}x{a["box"][3]-a["box"][1]} ({state})')
+    return "\n".join(lines)
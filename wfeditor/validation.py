@@ -0,0 +1,31 @@
+"""Structural checks of iwf.json and font.json documents"""
+
+def validate_iwf_data(data):
+    """Return a list of structural problems in an iwf.json document"""
+    problems = []
+    if not isinstance(data, dict):
+        return ["iwf.json must be an object"]
+    items = data.get("item", [])
+    if not isinstance(items, list):
+        return ['"item" must be a list']
+    for i, it in enumerate(items):
+        if not isinstance(it, dict):
+            problems.append(f"item {i}: must be an object")
+            continue
+        for key in ("widget", "type"):
+            if key not in it:
+                problems.append(f'item {i}: missing "{key}"')
+        for key in ("x", "y", "w", "h"):
+            if key in it and not isinstance(it[key], (int, float)):
+                problems.append(f'item {i}: "{key}" must be a number')
+    return problems
+
+def validate_font_data(data):
+    """Return a list of structural problems in a font.json document"""
+    problems = []
+    if not isinstance(data, dict) or not isinstance(data.get("item"), list):
+        return ['font.json must be an object with an "item" list']
+    for i, it in enumerate(data["item"]):
+        if not isinstance(it, dict) or not it.get("name"):
+            problems.append(f'font {i}: missing "name"')
+    return problems